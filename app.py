@@ -15,9 +15,9 @@ tabs = {
 st.sidebar.title("Navigation")
 selected_tab = st.sidebar.radio("Go to", list(tabs.keys()))
 
-# Check login status for restricted tabs
+# Check login status for restricted tabs (cached per session, verified locally)
 if selected_tab in ["Practice Log + Journaling", "Streak Tracker + Reports"]:
-    if not st.session_state.get("user"):
+    if not auth.current_user():
         st.warning("Please log in to access this feature.")
         auth.login_ui()
     else:
@@ -1,9 +1,9 @@
 ##########################
 # assessment.py  •  24-Apr-2025
 ##########################
-import json, time, statistics
+import json, time, statistics, os, re
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import json, streamlit as st, streamlit.components.v1 as components
 from streamlit_javascript import st_javascript
 from streamlit_autorefresh import st_autorefresh  
@@ -11,6 +11,7 @@ import streamlit as st
 import streamlit.components.v1 as components
 from streamlit_javascript import st_javascript
 from supabase_client import supabase   # ← provides a ready supabase instance
+import history
 
 # ------------------------------------------------------------------ #
 #   Streamlit re-run shim (keeps code compatible with old versions)  #
@@ -28,6 +29,17 @@ DOMAINS = [
     "Stress", "Mood", "Focus", "Social", "GABA", "Anxiety", "Motivation"
 ]
 
+# Domain -> whether a higher raw score is worse (profile, calibration)
+DOMAIN_IS_INVERSE = {
+    "Stress": True,
+    "Anxiety": True,
+    "Focus": False,
+    "Motivation": False,
+    "Mood": False,
+    "Social": False,
+    "GABA": False
+}
+
 BASE_WEIGHTS = {
     "Q2": {
         "Calm":   {"Stress": -0.10, "GABA":  0.10},
@@ -52,8 +64,84 @@ TWOBACK_WEIGHTS = {
     "rt_var":   {"Stress": -0.20, "Anxiety": -0.20},
 }
 
+# Answer options per question, in page order, and the multiplier each choice
+# feeds into update_scores() with BASE_WEIGHTS[domain][question]. The pages,
+# synthetic.py and calibrate.py all read these.
+ANSWER_OPTIONS = {
+    "Q1":  ["Better than usual", "Same as usual", "Worse than usual"],
+    "Q2":  ["Calm", "Alert", "Tense", "Tired"],
+    "Q3":  ["Very Positive", "Neutral", "Mild Negative", "Very Negative"],
+    "Q4":  ["Very often", "Occasionally", "Rarely", "Not at all"],
+    "Q5":  ["Very connected", "Somewhat connected", "Disconnected", "Isolated"],
+    "Q6":  ["Yes", "No"],
+    "Q8":  ["Yes, consistently", "Sometimes", "Rarely", "Not at all"],
+    "Q9":  ["None", "Mild", "Moderate", "Severe"],
+    "Q10": ["No", "Minor avoidance", "Moderate avoidance", "Yes, important things"],
+}
+BASELINE_MODS = [1.05, 1.0, 0.95]                     # per Q1 option
+# NB: Q3 ("Mild Negative" -5, "Very Negative" -1) and Q9 ("Moderate" 7,
+# "Severe" 1) are not monotone. They are kept as-is so scores stay
+# comparable with history; calibrate.py leaves their weights fixed until the
+# multipliers themselves are corrected.
+ANSWER_MULT = {   # question -> (domain, multiplier per option)
+    "Q3":  ("Mood",       [1.0, 0.0, -5.0, -1.0]),
+    "Q4":  ("Mood",       [1.0, 0.0, -1.0, -1.0]),
+    "Q5":  ("Social",     [1.0, 0.0, -1.0, -1.0]),
+    "Q6":  ("Social",     [1.0, 0.0]),
+    "Q8":  ("Motivation", [1.0, 0.0, -1.0, -1.0]),
+    "Q9":  ("Anxiety",    [0.0, 3.0, 7.0, 1.0]),
+    "Q10": ("Anxiety",    [0.0, 3.0, 6.0, 9.0]),
+}
+
 SUPABASE_TABLE = "assessments"
 
+# Calibrated weights override the constants above at startup. calibrate.py
+# writes to WEIGHTS_DIR/staging; a file goes live only when moved up into
+# WEIGHTS_DIR, and files fitted on synthetic fixtures are never loaded.
+WEIGHTS_DIR = os.getenv("RUDRAKSHYNC_WEIGHTS_DIR",
+                        os.path.join(os.path.dirname(os.path.abspath(__file__)), "weights"))
+WEIGHT_FILE_RE = re.compile(r"weights_v(\d+)\.json")
+WEIGHTS_VERSION = 0                                   # 0 = built-in constants
+
+def weight_files(weights_dir: str = WEIGHTS_DIR) -> List[Tuple[int, str]]:
+    """[(version, path)] of weights_v*.json files, oldest first."""
+    if not os.path.isdir(weights_dir):
+        return []
+    found = [(int(m.group(1)), os.path.join(weights_dir, f))
+             for f in os.listdir(weights_dir) if (m := WEIGHT_FILE_RE.fullmatch(f))]
+    return sorted(found)
+
+def _same_shape(a, b) -> bool:
+    """True if `a` has exactly b's nested keys, with numbers at the leaves."""
+    if isinstance(b, dict):
+        return (isinstance(a, dict) and a.keys() == b.keys()
+                and all(_same_shape(a[k], b[k]) for k in b))
+    return isinstance(a, (int, float)) and not isinstance(a, bool)
+
+def load_weight_file(weights_dir: str = WEIGHTS_DIR):
+    """
+    Swap in the newest usable weight file. Files that are unreadable, not
+    marked `"synthetic": false`, or whose maps don't have the built-ins' key
+    structure are skipped; with none left the constants stay.
+    """
+    global BASE_WEIGHTS, GONOGO_WEIGHTS, TWOBACK_WEIGHTS, WEIGHTS_VERSION
+    for version, path in reversed(weight_files(weights_dir)):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            maps = [data[k] for k in ("BASE_WEIGHTS", "GONOGO_WEIGHTS", "TWOBACK_WEIGHTS")]
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+        if data.get("synthetic", True):
+            continue
+        if all(_same_shape(m, ref) for m, ref in
+               zip(maps, (BASE_WEIGHTS, GONOGO_WEIGHTS, TWOBACK_WEIGHTS))):
+            BASE_WEIGHTS, GONOGO_WEIGHTS, TWOBACK_WEIGHTS = maps
+            WEIGHTS_VERSION = version
+            return
+
+load_weight_file()
+
 # ------------------------------------------------------------------ #
 #                        ──   STATE HELPERS   ──                     #
 # ------------------------------------------------------------------ #
@@ -71,6 +159,10 @@ def update_scores(weight_map: Dict[str, float], multiplier: float = 1.0):
     for d, w in weight_map.items():
         st.session_state.scores[d] += 10 * w * multiplier  # 10-point scale
 
+def score_answer(q: str, choice: str):
+    dom, mult = ANSWER_MULT[q]
+    update_scores({dom: BASE_WEIGHTS[dom][q]}, mult[ANSWER_OPTIONS[q].index(choice)])
+
 def bump_conf(domain: str, delta: float = 0.2):
     st.session_state.conf[domain] = min(1.0, st.session_state.conf[domain] + delta)
 
@@ -96,17 +188,17 @@ def page_start():
 # ------------------------------------------------------------------ #
 # 0 • Baseline (Q1) ------------------------------------------------- #
 def page_baseline():
-    opt = ["Better than usual", "Same as usual", "Worse than usual"]
+    opt = ANSWER_OPTIONS["Q1"]
     choice = st.radio("How does your current state compare to your usual baseline?", opt)
     st.session_state.user_data["Q1"] = choice
-    st.session_state.baseline_mod = 1.05 if choice == opt[0] else 0.95 if choice == opt[2] else 1.0
+    st.session_state.baseline_mod = BASELINE_MODS[opt.index(choice)]
     if st.button("Next »"):
         st.session_state.step += 1; _safe_rerun()
 
 # 1 • State word (Q2) ---------------------------------------------- #
 def page_state_word():
-    opt = ["Calm", "Alert", "Tense", "Tired"]
-    choice = st.radio("Right now, which word best describes your state?", opt, horizontal=True)
+    choice = st.radio("Right now, which word best describes your state?",
+                      ANSWER_OPTIONS["Q2"], horizontal=True)
     st.session_state.user_data["Q2"] = choice
     update_scores(BASE_WEIGHTS["Q2"][choice])
     if st.button("Next »"):
@@ -161,6 +253,10 @@ def score_gonogo(r: dict):
     rt_var   = statistics.stdev(rts)/statistics.mean(rts) if len(rts)>1 else 0.0
     rt_norm  = min(rt_var/0.4,1.0)
 
+    # keep trials + derived metrics with the answers (calibration / fixtures)
+    st.session_state.user_data["gonogo"] = {
+        **r, "commission": com_rate, "omission": omi_rate, "rt_var": rt_norm}
+
     update_scores(GONOGO_WEIGHTS["commission"], com_rate)
     update_scores(GONOGO_WEIGHTS["omission"], omi_rate)
     update_scores(GONOGO_WEIGHTS["rt_var"], rt_norm)
@@ -168,42 +264,28 @@ def score_gonogo(r: dict):
 
 # 3 • Mood block ----------------------------------------------------- #
 def page_mood():
-    moods = ["Very Positive", "Neutral", "Mild Negative", "Very Negative"]
-    mood = st.radio("Q3 • Rate your overall emotional tone today", moods)
+    mood = st.radio("Q3 • Rate your overall emotional tone today", ANSWER_OPTIONS["Q3"])
     st.session_state.user_data["Q3"] = mood
-    if mood == moods[0]:
-        update_scores({"Mood": +10*BASE_WEIGHTS["Mood"]["Q3"]/10})
-    elif mood == moods[2]:
-        update_scores({"Mood": -5 *BASE_WEIGHTS["Mood"]["Q3"]})
-    elif mood == moods[3]:
-        update_scores({"Mood": -10*BASE_WEIGHTS["Mood"]["Q3"]/10})
+    score_answer("Q3", mood)
 
     enjoy = st.radio("Q4 • Have you found meaning or joy in tasks recently?",
-                     ["Very often","Occasionally","Rarely","Not at all"])
+                     ANSWER_OPTIONS["Q4"])
     st.session_state.user_data["Q4"] = enjoy
-    if enjoy in ("Rarely","Not at all"):
-        update_scores({"Mood": -10*BASE_WEIGHTS["Mood"]["Q4"]/10})
-    elif enjoy == "Very often":
-        update_scores({"Mood": +10*BASE_WEIGHTS["Mood"]["Q4"]/10})
+    score_answer("Q4", enjoy)
 
     if st.button("Next »"):
         st.session_state.step += 1; _safe_rerun()
 
 # 4 • Social block --------------------------------------------------- #
 def page_social():
-    conn = st.radio("Q5 • How connected do you feel to others lately?",
-                    ["Very connected","Somewhat connected","Disconnected","Isolated"])
+    conn = st.radio("Q5 • How connected do you feel to others lately?", ANSWER_OPTIONS["Q5"])
     st.session_state.user_data["Q5"] = conn
-    if conn == "Very connected":
-        update_scores({"Social": +10*BASE_WEIGHTS["Social"]["Q5"]/10})
-    elif conn in ("Disconnected","Isolated"):
-        update_scores({"Social": -10*BASE_WEIGHTS["Social"]["Q5"]/10})
+    score_answer("Q5", conn)
 
     interact = st.radio("Q6 • Any emotionally meaningful interaction in last 48 h?",
-                        ["Yes","No"], horizontal=True)
+                        ANSWER_OPTIONS["Q6"], horizontal=True)
     st.session_state.user_data["Q6"] = interact
-    if interact=="Yes":
-        update_scores({"Social": +10*BASE_WEIGHTS["Social"]["Q6"]/10})
+    score_answer("Q6", interact)
 
     if st.button("Next »"):
         st.session_state.step += 1; _safe_rerun()
@@ -216,34 +298,23 @@ def page_motivation():
     update_scores({"Motivation": mot*BASE_WEIGHTS["Motivation"]["Q7"]})
 
     self_start = st.radio("Q8 • Do you initiate & complete tasks without pressure?",
-                          ["Yes, consistently","Sometimes","Rarely","Not at all"])
+                          ANSWER_OPTIONS["Q8"])
     st.session_state.user_data["Q8"] = self_start
-    if self_start=="Yes, consistently":
-        update_scores({"Motivation": +10*BASE_WEIGHTS["Motivation"]["Q8"]/10})
-    elif self_start in("Rarely","Not at all"):
-        update_scores({"Motivation": -10*BASE_WEIGHTS["Motivation"]["Q8"]/10})
+    score_answer("Q8", self_start)
 
     if st.button("Next »"):
         st.session_state.step += 1; _safe_rerun()
 
 # 6 • Anxiety block -------------------------------------------------- #
 def page_anxiety():
-    anx = st.radio("Q9 • Worry / internal restlessness in last 24 h",
-                   ["None","Mild","Moderate","Severe"])
+    anx = st.radio("Q9 • Worry / internal restlessness in last 24 h", ANSWER_OPTIONS["Q9"])
     st.session_state.user_data["Q9"] = anx
-    if anx=="Mild":
-        update_scores({"Anxiety": +3*BASE_WEIGHTS["Anxiety"]["Q9"]})
-    elif anx=="Moderate":
-        update_scores({"Anxiety": +7*BASE_WEIGHTS["Anxiety"]["Q9"]})
-    elif anx=="Severe":
-        update_scores({"Anxiety": +10*BASE_WEIGHTS["Anxiety"]["Q9"]/10})
+    score_answer("Q9", anx)
 
     avoid = st.radio("Q10 • Have you avoided anything due to fear or worry?",
-                     ["No","Minor avoidance","Moderate avoidance","Yes, important things"])
+                     ANSWER_OPTIONS["Q10"])
     st.session_state.user_data["Q10"] = avoid
-    if avoid!="No":
-        level = ["Minor avoidance","Moderate avoidance","Yes, important things"].index(avoid)+1
-        update_scores({"Anxiety": level*3*BASE_WEIGHTS["Anxiety"]["Q10"]})
+    score_answer("Q10", avoid)
 
     if st.button("Next »"):
         # decide clarifiers/2-Back
@@ -322,6 +393,8 @@ def score_twoback(r: dict):
     rtv  = statistics.stdev(rts)/statistics.mean(rts) if len(rts)>1 else 0.0
     rt_n = min(rtv/0.4,1.0)
 
+    st.session_state.user_data["twoback"] = {**r, "accuracy": acc, "rt_var": rt_n}
+
     update_scores(TWOBACK_WEIGHTS["accuracy"], acc)
     update_scores(TWOBACK_WEIGHTS["rt_var"],    rt_n)
     bump_conf("Focus"); bump_conf("Stress"); bump_conf("Anxiety")
@@ -351,10 +424,11 @@ def page_final():
         st.switch_page("practice.py")
 
 def save_to_supabase():
+    now = datetime.utcnow()
     payload = {
       "user_email": st.session_state.get("user_email"),
       "session_id": st.session_state.get("session_id"),
-      "timestamp": datetime.utcnow().isoformat(),
+      "timestamp": now.isoformat(),
       "scores": st.session_state.scores,
       "confidence": st.session_state.conf,
       "raw": st.session_state.user_data,
@@ -365,6 +439,12 @@ def save_to_supabase():
         st.success("Assessment saved.")
     except Exception as e:
         st.error(f"Supabase error: {e}")
+        return
+    # keep the pre-aggregated timeline in step with the new row
+    try:
+        history.record_assessment(history.owner_key(), now, st.session_state.scores)
+    except Exception as e:
+        st.warning(f"History not updated: {e}")
 
 # ------------------------------------------------------------------ #
 #                       ──   PAGE DISPATCH   ──                      #
@@ -1,5 +1,25 @@
 import streamlit as st
 import uuid
+import os, json, time, threading
+import urllib.error, urllib.request
+from typing import Any, Callable, Dict, Optional
+
+import jwt
+from supabase_client import SUPABASE_URL, SUPABASE_KEY
+
+# ------------------------------------------------------------------ #
+#                       ──   CONST ANCHOR   ──                       #
+# ------------------------------------------------------------------ #
+JWKS_URL = f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json"
+TOKEN_URL = f"{SUPABASE_URL}/auth/v1/token"
+JWT_AUDIENCE = "authenticated"
+JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")     # legacy HS256 projects only
+ASYMMETRIC_ALGS = ["RS256", "ES256"]
+
+KEYS_TTL = 600          # s – how long fetched signing keys are trusted
+KEYS_MIN_REFETCH = 30   # s – floor between refetches for an unknown kid
+REFRESH_MARGIN = 120    # s – refresh in background this long before exp
+LEEWAY = 10             # s – clock skew allowance
 
 def ensure_session_id():
     """
@@ -9,12 +29,235 @@ def ensure_session_id():
     if "session_id" not in st.session_state:
         st.session_state["session_id"] = str(uuid.uuid4())
 
+# ------------------------------------------------------------------ #
+#                   ──   PLUGGABLE AUTH BACKEND   ──                 #
+# ------------------------------------------------------------------ #
+def _fetch_jwks() -> dict:
+    req = urllib.request.Request(JWKS_URL, headers={"apikey": SUPABASE_KEY})
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        return json.load(resp)
+
+def _token_grant(grant_type: str, body: Dict[str, str]) -> Dict[str, Any]:
+    """
+    POST /auth/v1/token directly. Going through the shared `supabase` client
+    would store the session on it – switching every session's Postgrest
+    Authorization header to this user and starting its own refresh timer,
+    which spends AuthSession's single-use refresh token.
+    """
+    req = urllib.request.Request(
+        f"{TOKEN_URL}?grant_type={grant_type}", data=json.dumps(body).encode(),
+        headers={"apikey": SUPABASE_KEY, "Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            data = json.load(resp)
+    except urllib.error.HTTPError as e:
+        try:
+            err = json.load(e)
+        except ValueError:
+            err = {}
+        raise ValueError(err.get("error_description") or err.get("msg")
+                         or f"Auth request failed ({e.code})") from None
+    return {
+        "access_token": data["access_token"],
+        "refresh_token": data["refresh_token"],
+        "expires_at": data.get("expires_at") or int(time.time()) + int(data["expires_in"]),
+    }
+
+def _sign_in(email: str, password: str) -> Dict[str, Any]:
+    return _token_grant("password", {"email": email, "password": password})
+
+def _refresh(refresh_token: str) -> Dict[str, Any]:
+    return _token_grant("refresh_token", {"refresh_token": refresh_token})
+
+_backend: Dict[str, Callable] = {
+    "fetch_jwks": _fetch_jwks,
+    "sign_in": _sign_in,
+    "refresh": _refresh,
+}
+
+def configure(fetch_jwks: Callable = None, sign_in: Callable = None,
+              refresh: Callable = None):
+    """
+    Swap the issuer calls, e.g. for local_issuer.LocalIssuer in tests:
+        auth.configure(**issuer.backend())
+    """
+    for name, fn in (("fetch_jwks", fetch_jwks), ("sign_in", sign_in), ("refresh", refresh)):
+        if fn is not None:
+            _backend[name] = fn
+    _signing_keys.clear()
+
+# ------------------------------------------------------------------ #
+#                   ──   LOCAL JWT VERIFICATION   ──                 #
+# ------------------------------------------------------------------ #
+class SigningKeys:
+    """Process-wide JWKS cache keyed by kid; shared by every session."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._loaded_at = 0.0
+
+    def _load(self):
+        keys = {}
+        for k in _backend["fetch_jwks"]().get("keys", []):
+            try:
+                keys[k.get("kid")] = jwt.PyJWK(k)
+            except jwt.PyJWKError:
+                continue                            # unsupported key type
+        self._keys, self._loaded_at = keys, time.time()
+
+    def any(self) -> bool:
+        with self._lock:
+            if time.time() - self._loaded_at > KEYS_TTL:
+                self._load()
+            return bool(self._keys)
+
+    def get(self, kid: Optional[str]) -> jwt.PyJWK:
+        with self._lock:
+            age = time.time() - self._loaded_at
+            if age > KEYS_TTL or (kid not in self._keys and age > KEYS_MIN_REFETCH):
+                self._load()
+            if kid not in self._keys:
+                raise jwt.InvalidTokenError(f"Unknown signing key: {kid}")
+            return self._keys[kid]
+
+_signing_keys = SigningKeys()
+
+class AuthConfigError(RuntimeError):
+    """Tokens can't be verified with this deployment's configuration."""
+
+HS256_HELP = ("This Supabase project signs tokens with the legacy HS256 secret. "
+              "Set SUPABASE_JWT_SECRET (Project Settings → API → JWT Secret).")
+
+def config_error() -> Optional[str]:
+    """
+    Startup check: a project that publishes no signing keys uses HS256, so
+    logins can only be verified with SUPABASE_JWT_SECRET set.
+    """
+    if JWT_SECRET:
+        return None
+    try:
+        has_keys = _signing_keys.any()
+    except Exception:
+        return None                                 # network – verify_token reports later
+    return None if has_keys else HS256_HELP
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """Verify signature, expiry and audience locally; returns the claims."""
+    header = jwt.get_unverified_header(token)
+    alg = header.get("alg")
+    if alg == "HS256":
+        if not JWT_SECRET:
+            raise AuthConfigError(HS256_HELP)
+        key = JWT_SECRET
+    elif alg in ASYMMETRIC_ALGS:
+        key = _signing_keys.get(header.get("kid")).key
+    else:
+        raise jwt.InvalidAlgorithmError(f"Unsupported token algorithm: {alg}")
+    return jwt.decode(token, key, algorithms=[alg], audience=JWT_AUDIENCE, leeway=LEEWAY)
+
+# ------------------------------------------------------------------ #
+#                   ──   PER-SESSION AUTH STATE   ──                 #
+# ------------------------------------------------------------------ #
+class AuthSession:
+    """
+    Tokens and the resolved user for one browser session.
+    Lives in st.session_state["auth"]; the refresh thread only touches this
+    object, never Streamlit itself.
+    """
+
+    def __init__(self, tokens: Dict[str, Any]):
+        self._lock = threading.Lock()           # guards tokens / user
+        self._refresh_lock = threading.Lock()   # one refresh call at a time
+        self._refreshing = False
+        self.user: Optional[Dict[str, Any]] = None
+        self._set_tokens(tokens)
+
+    def _set_tokens(self, tokens: Dict[str, Any]):
+        claims = verify_token(tokens["access_token"])
+        self.access_token = tokens["access_token"]
+        self.refresh_token = tokens["refresh_token"]
+        self.expires_at = claims["exp"]
+        self.user = {"id": claims["sub"], "email": claims.get("email"),
+                     "role": claims.get("role")}
+
+    def _refresh(self, refresh_token: str):
+        """
+        Spend `refresh_token` once. Refresh tokens are single use, so a caller
+        that queued behind an in-flight refresh finds the token already
+        replaced and just picks up the result.
+        """
+        with self._refresh_lock:
+            try:
+                if self.refresh_token != refresh_token:
+                    return
+                tokens = _backend["refresh"](refresh_token)
+                with self._lock:
+                    self._set_tokens(tokens)
+            except Exception:
+                pass                                # resolve() falls back when exp passes
+            finally:
+                self._refreshing = False
+
+    def resolve(self) -> Optional[Dict[str, Any]]:
+        """Cached user while the access token is valid – no network I/O."""
+        now = time.time()
+        with self._lock:
+            token = self.refresh_token
+            if now >= self.expires_at + LEEWAY:
+                self.user = None
+            elif now >= self.expires_at - REFRESH_MARGIN and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, args=(token,), daemon=True).start()
+            if self.user is not None:
+                return self.user
+        # token lapsed (e.g. tab asleep) – one blocking refresh attempt,
+        # or wait for the background one if it's already in flight
+        self._refresh(token)
+        return self.user
+
+def sign_in(email: str, password: str) -> Dict[str, Any]:
+    sess = AuthSession(_backend["sign_in"](email, password))
+    st.session_state["auth"] = sess
+    st.session_state["user"] = sess.user
+    st.session_state["user_email"] = sess.user["email"] or email
+    return sess.user
+
+def sign_out():
+    for k in ("auth", "user", "user_email"):
+        st.session_state.pop(k, None)
+
+def current_user() -> Optional[Dict[str, Any]]:
+    """Logged-in user for this session, or None. Safe to call on every rerun."""
+    sess: Optional[AuthSession] = st.session_state.get("auth")
+    if sess is None:
+        return None
+    user = sess.resolve()
+    if user is None:
+        sign_out()
+    return user
+
+# ------------------------------------------------------------------ #
+#                          ──   PAGES   ──                           #
+# ------------------------------------------------------------------ #
 def login_ui():
     st.subheader("Log In or Sign Up")
-    st.text_input("Email")
-    st.text_input("Password", type="password")
-    st.button("Log In")
-    st.markdown("_(Add Supabase auth here)_")
+    problem = config_error()
+    if problem:
+        st.error(problem)
+        return
+    email = st.text_input("Email")
+    password = st.text_input("Password", type="password")
+    if st.button("Log In"):
+        try:
+            sign_in(email, password)
+        except Exception as e:
+            st.error(f"Login failed: {e}")
+            return
+        st.rerun()
 
 def show_about():
     st.title("About RudrakshYnc")
@@ -0,0 +1,328 @@
+##########################
+# calibrate.py  •  offline weight calibration
+##########################
+"""
+Fits BASE_WEIGHTS / GONOGO_WEIGHTS / TWOBACK_WEIGHTS against practice-session
+self-reports and writes a versioned weight file to WEIGHTS_DIR/staging.
+Review it there; it goes live only once moved up into WEIGHTS_DIR, and
+files fitted on a synthetic fixture are marked as such and never loaded.
+
+Every weight in those maps is the coefficient of one feature in the linear
+part of the scoring (score_d = 5 + Σ 10·w·multiplier). The features, X,
+come from the raw answers and task metrics of an assessment. The target is
+the practice session that followed it (within --horizon days): for each
+factor the session was built for, the user's before-intensity (0–10)
+signed by the practised polarity and mapped onto the raw score scale,
+
+    y_d = 5 · sign_d · polarity · intensity / 10      (sign_d = -1 if inverse)
+
+Domains a session didn't practise carry no target.
+
+Limitations (also recorded in the weight file's "limitations"):
+  - polarity, and which factors were practised, come from the scores the
+    current weights produced – a fit can re-scale a domain but not flip it,
+    and it only sees domains the current weights flagged;
+  - intensity is one slider per session, shared by every practised factor;
+  - it is a concurrent self-report, not a follow-up outcome. The
+    improvement rating is stored but not used until there is a per-factor
+    after-vs-before signal to pair it with.
+
+Q3 and Q9 have non-monotone multipliers (see assessment.ANSWER_MULT), so
+their weights stay fixed and their contribution is taken off the target.
+
+X^T X and X^T y are accumulated per domain, chunk by chunk (memory stays
+bounded). All domains are then solved together in one batched ridge solve,
+shrunk towards the current weights:
+
+    (X_d^T X_d / n_d + α I) w_d = X_d^T y_d / n_d + α w0_d
+
+    python calibrate.py fixture.db --alpha 0.5
+    python calibrate.py snapshot.db --pull          # copy Supabase rows first
+"""
+import os, json, sqlite3, argparse, time
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from assessment import (DOMAINS, DOMAIN_IS_INVERSE, BASE_WEIGHTS, GONOGO_WEIGHTS,
+                        TWOBACK_WEIGHTS, ANSWER_OPTIONS, ANSWER_MULT, SUPABASE_TABLE,
+                        WEIGHTS_DIR, weight_files)
+from local_store import SCHEMA, INDEXES, ASSESSMENT_COLS, PRACTICE_COLS
+
+# ------------------------------------------------------------------ #
+#                       ──   CONST ANCHOR   ──                       #
+# ------------------------------------------------------------------ #
+CATEGORICAL = ["Q2", "Q3", "Q4", "Q5", "Q6", "Q8", "Q9", "Q10"]
+FROZEN = ("Q3", "Q9")          # non-monotone multipliers – weights kept as-is
+STAGING_DIR = os.path.join(WEIGHTS_DIR, "staging")
+LIMITATIONS = [
+    "polarity and practised factors come from scores made with the current weights",
+    "one before-intensity per session is shared by all practised factors",
+    "concurrent self-report, not a follow-up outcome; improvement is unused",
+    "Q3 and Q9 weights are frozen (non-monotone multipliers)",
+]
+METRICS = [("gonogo", k) for k in GONOGO_WEIGHTS] + [("twoback", k) for k in TWOBACK_WEIGHTS]
+
+# Raw columns pulled per row; json_extract runs inside SQLite (C), so rows
+# reach Python already flat.
+COLUMNS = (CATEGORICAL + ["Q7"] + [f"{t}.{k}" for t, k in METRICS]
+           + ["intensity"] + [f"factor.{d}" for d in DOMAINS])
+SIGN = np.array([-1.0 if DOMAIN_IS_INVERSE.get(d) else 1.0 for d in DOMAINS])
+
+# ------------------------------------------------------------------ #
+#                      ──   PARAMETER SLOTS   ──                     #
+# ------------------------------------------------------------------ #
+def weight_slots() -> List[Tuple[Tuple[str, ...], str]]:
+    """
+    One (path, domain) per tunable weight, e.g.
+      (("BASE_WEIGHTS", "Q2", "Calm", "Stress"), "Stress")
+      (("BASE_WEIGHTS", "Mood", "Q3"), "Mood")
+      (("GONOGO_WEIGHTS", "rt_var", "Anxiety"), "Anxiety")
+    The layout follows the current maps, so calibration never invents slots.
+    """
+    slots = []
+    for choice, wm in BASE_WEIGHTS["Q2"].items():
+        slots += [(("BASE_WEIGHTS", "Q2", choice, d), d) for d in wm]
+    for dom, qs in BASE_WEIGHTS.items():
+        if dom != "Q2":
+            slots += [(("BASE_WEIGHTS", dom, q), dom) for q in qs if q not in FROZEN]
+    for name, wmap in (("GONOGO_WEIGHTS", GONOGO_WEIGHTS), ("TWOBACK_WEIGHTS", TWOBACK_WEIGHTS)):
+        for metric, wm in wmap.items():
+            slots += [((name, metric, d), d) for d in wm]
+    return slots
+
+def _current(path: Tuple[str, ...]) -> float:
+    node = {"BASE_WEIGHTS": BASE_WEIGHTS, "GONOGO_WEIGHTS": GONOGO_WEIGHTS,
+            "TWOBACK_WEIGHTS": TWOBACK_WEIGHTS}
+    for k in path:
+        node = node[k]
+    return float(node)
+
+# ------------------------------------------------------------------ #
+#                          ──   FEATURES   ──                        #
+# ------------------------------------------------------------------ #
+def features(cols: Dict[str, np.ndarray], slots) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Column arrays for one chunk -> (X, Y). X[:, j] is what slot j's weight
+    multiplies in update_scores (incl. the ×10); Y[:, d] is the practice
+    target, NaN for domains the session didn't cover. Rows with feature
+    gaps are dropped.
+    """
+    codes = {q: pd.Categorical(cols[q], categories=ANSWER_OPTIONS[q]).codes for q in CATEGORICAL}
+    num = lambda k: pd.to_numeric(pd.Series(cols[k]), errors="coerce").to_numpy(float)
+
+    X = np.empty((len(cols["Q2"]), len(slots)))
+    for j, (path, _) in enumerate(slots):
+        group = path[0]
+        if group == "BASE_WEIGHTS" and path[1] == "Q2":
+            c = codes["Q2"]
+            x = np.where(c < 0, np.nan, c == ANSWER_OPTIONS["Q2"].index(path[2]))
+        elif group == "BASE_WEIGHTS" and path[2] == "Q7":
+            x = num("Q7")
+        elif group == "BASE_WEIGHTS":
+            c = codes[path[2]]
+            x = np.where(c < 0, np.nan, np.asarray(ANSWER_MULT[path[2]][1])[np.maximum(c, 0)])
+        else:
+            x = num(f"{'gonogo' if group == 'GONOGO_WEIGHTS' else 'twoback'}.{path[1]}")
+        X[:, j] = 10.0 * x
+
+    polarity = np.column_stack([
+        pd.Series(cols[f"factor.{d}"]).map({"positive": 1.0, "negative": -1.0}).to_numpy(float)
+        for d in DOMAINS])
+    Y = 5.0 * SIGN * polarity * (num("intensity") / 10.0)[:, None]
+    for q in FROZEN:                                # fixed part of the score
+        dom, mult = ANSWER_MULT[q]
+        c = codes[q]
+        fixed = 10.0 * BASE_WEIGHTS[dom][q] * np.asarray(mult)[np.maximum(c, 0)]
+        Y[:, DOMAINS.index(dom)] -= np.where(c < 0, np.nan, fixed)
+    ok = ~np.isnan(X).any(1) & ~np.isnan(Y).all(1)
+    return X[ok], Y[ok]
+
+# ------------------------------------------------------------------ #
+#                           ──   SOURCES   ──                        #
+# ------------------------------------------------------------------ #
+def iter_sqlite(path: str, horizon_days: float = 1.0,
+                chunk: int = 200_000) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Stream (answers, metrics, practice outcome) column chunks: each
+    `practice_sessions` row joined to the user's latest assessment before
+    it – the synthetic.py fixture or a --pull snapshot.
+    """
+    extract = ", ".join(
+        [f"json_extract(a.raw, '$.{c}')" for c in CATEGORICAL + ["Q7"]]
+        + [f"json_extract(a.raw, '$.{t}.{k}')" for t, k in METRICS]
+        + ["json_extract(p.before, '$.intensity')"]
+        + [f"json_extract(p.factors, '$.{d}')" for d in DOMAINS])
+    sql = f"""
+        SELECT {extract}
+        FROM practice_sessions p
+        JOIN assessments a ON a.id = (
+            SELECT id FROM assessments
+            WHERE user_email = p.user_email AND timestamp <= p.started_at
+            ORDER BY timestamp DESC LIMIT 1)
+        WHERE p.user_email IS NOT NULL AND p.factors IS NOT NULL
+          AND julianday(p.started_at) - julianday(a.timestamp) <= ?
+    """
+    con = sqlite3.connect(path)
+    cur = con.execute(sql, (horizon_days,))
+    while True:
+        rows = cur.fetchmany(chunk)
+        if not rows:
+            break
+        yield dict(zip(COLUMNS, zip(*rows)))
+    con.close()
+
+def _pull_table(con, table: str, cols: List[str], order: str, page: int):
+    from supabase_client import supabase
+    start = 0
+    while True:
+        rows = supabase.table(table).select(", ".join(cols))\
+            .order(order).range(start, start + page - 1).execute().data or []
+        with con:
+            con.executemany(
+                f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                [tuple(json.dumps(r[c]) if isinstance(r[c], (dict, list)) else r[c]
+                       for c in cols) for r in rows])
+        if len(rows) < page:
+            break
+        start += page
+
+def pull_supabase(path: str, page: int = 1000):
+    """Copy the Supabase assessments + practice_sessions tables into SQLite."""
+    con = sqlite3.connect(path)
+    con.executescript(SCHEMA)
+    _pull_table(con, SUPABASE_TABLE, ASSESSMENT_COLS, "timestamp", page)
+    _pull_table(con, "practice_sessions", PRACTICE_COLS, "started_at", page)
+    con.executescript(INDEXES)
+    con.close()
+
+# ------------------------------------------------------------------ #
+#                            ──   FIT   ──                           #
+# ------------------------------------------------------------------ #
+def domain_slots(slots) -> List[np.ndarray]:
+    """Slot indices per domain, in DOMAINS order."""
+    return [np.array([j for j, (_, d) in enumerate(slots) if d == dom], int) for dom in DOMAINS]
+
+def accumulate(chunks: Iterator[Dict[str, np.ndarray]], slots):
+    """
+    Per-domain running X_d^T X_d, X_d^T y_d, Σ y_d² and n_d over all chunks,
+    each over the rows where domain d was practised.
+    """
+    idx = domain_slots(slots)
+    XtX = [np.zeros((len(ix), len(ix))) for ix in idx]
+    XtY = [np.zeros(len(ix)) for ix in idx]
+    YtY, n = np.zeros(len(DOMAINS)), np.zeros(len(DOMAINS), int)
+    for cols in chunks:
+        X, Y = features(cols, slots)
+        for k, ix in enumerate(idx):
+            rows = ~np.isnan(Y[:, k])
+            Xd, yd = X[np.ix_(rows, ix)], Y[rows, k]
+            XtX[k] += Xd.T @ Xd
+            XtY[k] += Xd.T @ yd
+            YtY[k] += yd @ yd
+            n[k] += len(yd)
+    return XtX, XtY, YtY, n
+
+def solve(XtX, XtY, n, slots, alpha: float) -> np.ndarray:
+    """
+    Per-domain ridge towards the current weights, all domains in one batched
+    np.linalg.solve (blocks padded to equal size with identity rows).
+    Domains with no practice data keep their current weights.
+    Returns the fitted weight per slot.
+    """
+    w0 = np.array([_current(path) for path, _ in slots])
+    idx = domain_slots(slots)
+    m = max(len(i) for i in idx)
+
+    A = np.tile(np.eye(m), (len(DOMAINS), 1, 1))
+    b = np.zeros((len(DOMAINS), m, 1))
+    for k, ix in enumerate(idx):
+        s, nk = len(ix), max(n[k], 1)
+        A[k, :s, :s] = XtX[k] / nk + alpha * np.eye(s)
+        b[k, :s, 0] = XtY[k] / nk + alpha * w0[ix]
+    sol = np.linalg.solve(A, b)[..., 0]
+
+    w = w0.copy()
+    for k, ix in enumerate(idx):
+        if n[k]:
+            w[ix] = sol[k, :len(ix)]
+    return w
+
+def r2(XtX, XtY, YtY, n, slots, w) -> Dict[str, float]:
+    """Uncentred R² per domain, straight from the accumulated moments."""
+    out = {}
+    for k, (dom, ix) in enumerate(zip(DOMAINS, domain_slots(slots))):
+        if not len(ix) or not YtY[k]:
+            continue
+        wd = w[ix]
+        sse = YtY[k] - 2 * wd @ XtY[k] + wd @ XtX[k] @ wd
+        out[dom] = round(float(1 - sse / YtY[k]), 4)
+    return out
+
+# ------------------------------------------------------------------ #
+#                        ──   WEIGHT FILE   ──                       #
+# ------------------------------------------------------------------ #
+def write_weights(w: np.ndarray, slots, meta: dict, weights_dir: str = WEIGHTS_DIR) -> str:
+    maps = json.loads(json.dumps({"BASE_WEIGHTS": BASE_WEIGHTS, "GONOGO_WEIGHTS": GONOGO_WEIGHTS,
+                                  "TWOBACK_WEIGHTS": TWOBACK_WEIGHTS}))     # deep copy
+    for (path, _), v in zip(slots, w):
+        node = maps
+        for key in path[:-1]:
+            node = node[key]
+        node[path[-1]] = round(float(v), 4)
+
+    os.makedirs(weights_dir, exist_ok=True)
+    version = max((v for v, _ in weight_files(weights_dir)), default=0) + 1
+    out = os.path.join(weights_dir, f"weights_v{version:04d}.json")
+    with open(out, "w") as f:
+        json.dump({"version": version, **meta, **maps}, f, indent=2)
+    return out
+
+# ------------------------------------------------------------------ #
+def is_synthetic(db: str) -> bool:
+    """True if any assessment in db came from synthetic.py."""
+    con = sqlite3.connect(db)
+    try:
+        return con.execute("SELECT 1 FROM assessments WHERE source = 'synthetic' LIMIT 1"
+                           ).fetchone() is not None
+    finally:
+        con.close()
+
+def calibrate(db: str, alpha: float = 0.5, horizon_days: float = 1.0,
+              chunk: int = 200_000, weights_dir: str = STAGING_DIR) -> str:
+    t0 = time.time()
+    slots = weight_slots()
+    XtX, XtY, YtY, n = accumulate(iter_sqlite(db, horizon_days, chunk), slots)
+    if not n.any():
+        raise ValueError(f"No practice sessions within {horizon_days} days of an assessment in {db}")
+    w = solve(XtX, XtY, n, slots, alpha)
+    return write_weights(w, slots, {
+        "created_at": datetime.utcnow().isoformat(),
+        "source": os.path.basename(db),
+        "synthetic": is_synthetic(db),
+        "target": "practice_sessions.before.intensity",
+        "limitations": LIMITATIONS,
+        "n_samples": dict(zip(DOMAINS, n.tolist())),
+        "alpha": alpha,
+        "horizon_days": horizon_days,
+        "r2": r2(XtX, XtY, YtY, n, slots, w),
+        "fit_seconds": round(time.time() - t0, 2),
+    }, weights_dir)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Calibrate assessment weights against practice outcomes.")
+    ap.add_argument("db", help="SQLite file with `assessments` and `practice_sessions` tables")
+    ap.add_argument("--pull", action="store_true",
+                    help="first copy Supabase assessments + practice_sessions into db")
+    ap.add_argument("--alpha", type=float, default=0.5, help="ridge strength towards current weights")
+    ap.add_argument("--horizon", type=float, default=1.0,
+                    help="max days from the assessment to its practice session")
+    ap.add_argument("--chunk", type=int, default=200_000)
+    ap.add_argument("--out", default=STAGING_DIR,
+                    help="where to write the weight file (not loaded until moved to WEIGHTS_DIR)")
+    a = ap.parse_args()
+    if a.pull:
+        pull_supabase(a.db)
+    print(calibrate(a.db, a.alpha, a.horizon, a.chunk, a.out))
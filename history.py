@@ -0,0 +1,154 @@
+##########################
+# history.py  •  score timeline
+##########################
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import streamlit as st
+import matplotlib.pyplot as plt
+from supabase_client import supabase
+
+# ------------------------------------------------------------------ #
+#                       ──   CONST ANCHOR   ──                       #
+# ------------------------------------------------------------------ #
+BUCKET_TABLE = "score_buckets"
+GRANULARITIES = ("day", "week", "month")
+
+# range label -> (granularity, days back; None = all time)
+RANGES = {
+    "Last 90 days": ("day", 90),
+    "Last year":    ("week", 365),
+    "All time":     ("month", None),
+}
+
+MAX_BUCKETS = 400      # hard cap on rows fetched per view
+MAX_POINTS  = 120      # points per domain line after LTTB
+
+# ------------------------------------------------------------------ #
+#                       ──   BUCKET HELPERS   ──                     #
+# ------------------------------------------------------------------ #
+def owner_key() -> Optional[str]:
+    """Buckets are written under the logged-in email, else the anonymous session."""
+    return st.session_state.get("user_email") or st.session_state.get("session_id")
+
+def owner_keys() -> List[str]:
+    """
+    Every owner this session's history can live under – the email and the
+    session_id – matching profile's `user_email OR session_id` score lookup.
+    """
+    keys = [st.session_state.get("user_email"), st.session_state.get("session_id")]
+    return [k for k in dict.fromkeys(keys) if k]
+
+def merge_buckets(a: dict, b: dict) -> dict:
+    """
+    Combine two rows for the same bucket_start (e.g. email + session owner).
+    Rows keep count / sum / min / max per domain so means stay exact.
+    """
+    sums = dict(a.get("sums") or {})
+    mins = dict(a.get("mins") or {})
+    maxs = dict(a.get("maxs") or {})
+    for d, v in (b.get("sums") or {}).items():
+        sums[d] = sums.get(d, 0.0) + v
+    for d, v in (b.get("mins") or {}).items():
+        mins[d] = min(mins.get(d, v), v)
+    for d, v in (b.get("maxs") or {}).items():
+        maxs[d] = max(maxs.get(d, v), v)
+    return {**a, "n": int(a.get("n") or 0) + int(b.get("n") or 0),
+            "sums": sums, "mins": mins, "maxs": maxs}
+
+def record_assessment(owner: str, ts: datetime, scores: Dict[str, float]):
+    """
+    Fold one new assessment into its day / week / month buckets.
+    One RPC (sql/score_buckets.sql) – the increment runs server-side in an
+    ON CONFLICT DO UPDATE, so concurrent submits can't lose counts.
+    """
+    if not owner or not scores:
+        return
+    supabase.rpc("record_score_bucket", {
+        "p_owner": owner,
+        "p_ts": ts.isoformat(),
+        "p_scores": {d: float(v) for d, v in scores.items()},
+    }).execute()
+
+def fetch_buckets(owners: List[str], granularity: str, days: Optional[int] = None) -> List[dict]:
+    """Return at most MAX_BUCKETS bucket rows (oldest first) for the range."""
+    if not owners:
+        return []
+    q = supabase.table(BUCKET_TABLE).select("bucket_start, n, sums, mins, maxs")\
+        .in_("owner", owners)\
+        .eq("granularity", granularity)
+    if days is not None:
+        since = (datetime.utcnow().date() - timedelta(days=days)).isoformat()
+        q = q.gte("bucket_start", since)
+    rows = q.order("bucket_start", desc=True)\
+        .limit(MAX_BUCKETS * len(owners)).execute().data or []
+
+    merged: Dict[str, dict] = {}
+    for r in rows:
+        k = r["bucket_start"]
+        merged[k] = merge_buckets(merged[k], r) if k in merged else r
+    return [merged[k] for k in sorted(merged)[-MAX_BUCKETS:]]
+
+# ------------------------------------------------------------------ #
+#                       ──   DOWNSAMPLING   ──                       #
+# ------------------------------------------------------------------ #
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `threshold` points that keep
+    the visual shape of (x, y). First and last points are always kept.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)   # inner buckets
+    picked = np.empty(threshold, dtype=int)
+    picked[0], picked[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the *next* bucket is the third triangle vertex
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+# ------------------------------------------------------------------ #
+#                          ──   VIEW   ──                            #
+# ------------------------------------------------------------------ #
+def show_history(owners: List[str]):
+    st.subheader("Score History")
+    label = st.radio("Range", list(RANGES.keys()), horizontal=True, key="history_range")
+    granularity, days = RANGES[label]
+
+    try:
+        rows = fetch_buckets(owners, granularity, days)
+    except Exception as e:
+        st.error(f"Error fetching history: {e}")
+        return
+    if not rows:
+        st.info("No history yet – your timeline builds up as you take assessments.")
+        return
+
+    x = np.array([np.datetime64(r["bucket_start"]) for r in rows])
+    xf = x.astype("datetime64[D]").astype(float)
+    domains = sorted({d for r in rows for d in (r.get("sums") or {})})
+
+    fig, ax = plt.subplots(figsize=(8, 3.5))
+    for d in domains:
+        have = np.array([d in (r.get("sums") or {}) for r in rows])
+        means = np.array([r["sums"][d] / r["n"] for r, h in zip(rows, have) if h])
+        keep = lttb(xf[have], means, MAX_POINTS)
+        ax.plot(x[have][keep], means[keep], label=d, linewidth=1.2)
+    ax.set_ylim(0, 10)
+    ax.set_ylabel(f"Mean score per {granularity}")
+    ax.legend(loc="upper left", fontsize="small", ncol=4)
+    fig.autofmt_xdate()
+    st.pyplot(fig)
@@ -0,0 +1,77 @@
+##########################
+# local_issuer.py  •  offline stand-in for Supabase Auth
+##########################
+import json, secrets, time, uuid
+from typing import Any, Dict
+
+import jwt
+from jwt.algorithms import ECAlgorithm
+from cryptography.hazmat.primitives.asymmetric import ec
+
+ISSUER = "http://localhost/auth/v1"
+
+class LocalIssuer:
+    """
+    Signs ES256 access tokens the way Supabase Auth does and exposes the
+    matching JWKS, so auth.py can run with no network:
+
+        issuer = LocalIssuer(ttl=5)
+        issuer.add_user("a@b.c", "pw")
+        auth.configure(**issuer.backend())
+    """
+
+    def __init__(self, ttl: int = 3600):
+        self.ttl = ttl
+        self._users: Dict[str, Dict[str, str]] = {}     # email -> {id, password}
+        self._refresh: Dict[str, str] = {}              # refresh_token -> email
+        self.jwks_calls = 0
+        self.rotate_key()
+
+    # ---------------- keys ---------------- #
+    def rotate_key(self):
+        self.kid = f"local-{uuid.uuid4().hex[:8]}"
+        self._key = ec.generate_private_key(ec.SECP256R1())
+
+    def jwks(self) -> dict:
+        self.jwks_calls += 1
+        jwk = json.loads(ECAlgorithm.to_jwk(self._key.public_key()))
+        jwk.update(kid=self.kid, alg="ES256", use="sig")
+        return {"keys": [jwk]}
+
+    # ---------------- users & tokens ---------------- #
+    def add_user(self, email: str, password: str) -> str:
+        uid = str(uuid.uuid4())
+        self._users[email] = {"id": uid, "password": password}
+        return uid
+
+    def issue(self, email: str, ttl: int = None) -> Dict[str, Any]:
+        now = int(time.time())
+        exp = now + (self.ttl if ttl is None else ttl)
+        claims = {
+            "sub": self._users[email]["id"], "email": email,
+            "aud": "authenticated", "role": "authenticated",
+            "iss": ISSUER, "iat": now, "exp": exp,
+        }
+        refresh_token = secrets.token_urlsafe(24)
+        self._refresh[refresh_token] = email
+        return {
+            "access_token": jwt.encode(claims, self._key, algorithm="ES256",
+                                       headers={"kid": self.kid}),
+            "refresh_token": refresh_token,
+            "expires_at": exp,
+        }
+
+    def sign_in(self, email: str, password: str) -> Dict[str, Any]:
+        user = self._users.get(email)
+        if not user or user["password"] != password:
+            raise ValueError("Invalid login credentials")
+        return self.issue(email)
+
+    def refresh(self, refresh_token: str) -> Dict[str, Any]:
+        email = self._refresh.pop(refresh_token, None)    # single use, like Supabase
+        if email is None:
+            raise ValueError("Invalid refresh token")
+        return self.issue(email)
+
+    def backend(self) -> Dict[str, Any]:
+        return {"fetch_jwks": self.jwks, "sign_in": self.sign_in, "refresh": self.refresh}
@@ -0,0 +1,32 @@
+##########################
+# local_store.py  •  SQLite stand-in for the Supabase tables
+##########################
+"""
+Schema shared by synthetic.py (writes fixtures) and calibrate.py (reads
+fixtures and --pull snapshots). Column names match the Supabase tables.
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY,
+    user_email TEXT, session_id TEXT, timestamp TEXT,
+    scores TEXT, confidence TEXT, raw TEXT, source TEXT
+);
+CREATE TABLE IF NOT EXISTS score_buckets (
+    owner TEXT, granularity TEXT, bucket_start TEXT,
+    n INTEGER, sums TEXT, mins TEXT, maxs TEXT,
+    PRIMARY KEY (owner, granularity, bucket_start)
+);
+CREATE TABLE IF NOT EXISTS practice_sessions (
+    id INTEGER PRIMARY KEY,
+    user_email TEXT, session_id TEXT, started_at TEXT, finished_at TEXT,
+    before TEXT, steps TEXT, after TEXT, improvement REAL, factors TEXT
+);
+"""
+INDEXES = """
+CREATE INDEX IF NOT EXISTS assessments_user_ts ON assessments (user_email, timestamp);
+"""
+ASSESSMENT_COLS = ["user_email", "session_id", "timestamp",
+                   "scores", "confidence", "raw", "source"]
+PRACTICE_COLS = ["user_email", "session_id", "started_at", "finished_at",
+                 "before", "steps", "after", "improvement", "factors"]
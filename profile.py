@@ -2,19 +2,10 @@ import streamlit as st
 import matplotlib.pyplot as plt
 import math
 from supabase_client import supabase
-
-############################
-# Domain -> whether higher raw means negative
-############################
-DOMAIN_IS_INVERSE = {
-    "Stress": True,
-    "Anxiety": True,
-    "Focus": False,
-    "Motivation": False,
-    "Mood": False,
-    "Social": False,
-    "GABA": False
-}
+import auth
+import history
+import session_runner
+from assessment import DOMAIN_IS_INVERSE   # domain -> whether higher raw means negative
 
 def normalize_score(domain: str, raw_score: float) -> float:
     """
@@ -118,6 +109,23 @@ def save_user_sequence(user_id, step_ids):
     }).execute()
     # pass
 
+def save_practice_session(user_email, result, factors):
+    """
+    Insert one finished practice session (as posted by the session runner)
+    into practice_sessions, with the {factor: polarity} it was built for.
+    """
+    supabase.table("practice_sessions").insert({
+        "user_email": user_email,
+        "session_id": st.session_state.get("session_id"),
+        "started_at": result.get("started_at"),
+        "finished_at": result.get("finished_at"),
+        "before": result.get("before"),
+        "steps": result.get("steps"),
+        "after": result.get("after"),
+        "improvement": result.get("improvement"),
+        "factors": factors
+    }).execute()
+
 ############################
 # MAIN: show_profile
 ############################
@@ -187,6 +195,9 @@ def show_profile():
         "_Note: The percentages reflect the **absolute** normalized scores relative to the total._"
     )
 
+    # 4b) Score timeline from pre-aggregated buckets
+    history.show_history(history.owner_keys())
+
     # 5) Find the minimal set of factors that covers >=50% of sum_abs
     # Sort by descending abs value
     sorted_factors = sorted(norm_scores.items(), key=lambda x: abs(x[1]), reverse=True)
@@ -236,66 +247,33 @@ def show_profile():
                 "step_id": s["id"],
                 "instruction": s["instruction"],
                 "before_prompt": s["before_prompt"],
-                "after_prompt": s["after_prompt"]
+                "after_prompt": s["after_prompt"],
+                "duration_sec": s.get("duration_sec")
             })
             all_step_ids.append(s["id"])
 
-    # store user sequence in DB
-    if all_step_ids:
-        save_user_sequence(user_id, all_step_ids)
+    # store user sequence in DB (once per plan, not on every rerun)
+    user = auth.current_user()
+    if user and all_step_ids and st.session_state.get("user_sequence_saved") != all_step_ids:
+        try:
+            save_user_sequence(user["id"], all_step_ids)
+            st.session_state["user_sequence_saved"] = all_step_ids
+        except Exception as e:
+            st.error(f"Error saving sequence: {e}")
 
     # 7) Present 3-part flow: Journaling Before, Practice Steps, Journaling After
+    # The whole session runs in the browser and posts back once on submit.
     st.subheader("Practice Session")
+    result = session_runner.run_practice_session(combined_steps)
 
-    ### 7a) Journaling Before
-    st.markdown("### 1. Journaling Before")
-    all_before_prompts = []
-    for step_num, items in combined_steps.items():
-        # each item might have a before_prompt
-        for it in items:
-            if it["before_prompt"]:
-                all_before_prompts.append(f"**({it['factor']} - Step {step_num})** {it['before_prompt']}")
-    if all_before_prompts:
-        st.text_area("Please reflect on these before prompts:",
-                     "\n\n".join(all_before_prompts),
-                     key="journaling_before")
-    else:
-        st.write("*No specific before prompts.*")
-
-    ### 7b) Practice Steps (up to 4 total)
-    st.markdown("### 2. Practice Steps")
-    max_step_num = max(combined_steps.keys()) if combined_steps else 0
-    for step_num in range(1, max_step_num+1):
-        items = combined_steps[step_num]
-        if not items:
-            continue
-
-        st.markdown(f"#### Step {step_num}")
-        # Combine instructions for all factors in this step
-        combined_instructions = []
-        for it in items:
-            combined_instructions.append(f"- **{it['factor']}**: {it['instruction']}")
-        st.write("\n".join(combined_instructions))
-        st.write("---")
-
-    ### 7c) Journaling After
-    st.markdown("### 3. Journaling After")
-    all_after_prompts = []
-    for step_num, items in combined_steps.items():
-        for it in items:
-            if it["after_prompt"]:
-                all_after_prompts.append(f"**({it['factor']} - Step {step_num})** {it['after_prompt']}")
-    if all_after_prompts:
-        st.text_area("Reflect on these after prompts:",
-                     "\n\n".join(all_after_prompts),
-                     key="journaling_after")
-    else:
-        st.write("*No specific after prompts.*")
-
-    ### 7d) Improvement Slider
-    # We only show it if user has typed something in "journaling_after" (as an example).
-    if st.session_state.get("journaling_after"):
-        improvement = st.slider("How much do you feel you've improved (0=none, 100=complete)?", 0, 100, 50)
-        st.write(f"Improvement reported: {improvement}%")
-    else:
-        st.info("Please fill in your 'Journaling After' reflections above to enable the Improvement slider.")
+    ### 7a) Persist the finished session (once per submission)
+    if result and st.session_state.get("practice_session_saved") != result.get("finished_at"):
+        try:
+            factors = {it["factor"]: it["polarity"]
+                       for items in combined_steps.values() for it in items}
+            save_practice_session(user_email, result, factors)
+            st.session_state["practice_session_saved"] = result.get("finished_at")
+        except Exception as e:
+            st.error(f"Error saving session: {e}")
+    if result and st.session_state.get("practice_session_saved") == result.get("finished_at"):
+        st.success(f"Session saved. Improvement reported: {result['improvement']}%")
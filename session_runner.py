@@ -0,0 +1,63 @@
+##########################
+# session_runner.py  •  browser-side practice session
+##########################
+import os, hashlib
+from typing import Dict, List, Optional
+
+import streamlit.components.v1 as components
+
+# ------------------------------------------------------------------ #
+#                       ──   CONST ANCHOR   ──                       #
+# ------------------------------------------------------------------ #
+_COMPONENT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "script", "practice_session"
+)
+_practice_session = components.declare_component("practice_session", path=_COMPONENT_DIR)
+
+DEFAULT_STEP_SECONDS = 60
+
+# ------------------------------------------------------------------ #
+#                          ──   HELPERS   ──                         #
+# ------------------------------------------------------------------ #
+def build_plan(combined_steps: Dict[int, List[dict]]) -> List[dict]:
+    """
+    Flatten profile's combined_steps {step_number: [items]} into an ordered,
+    JSON-safe plan. Step duration is the longest `duration_sec` among its
+    items, falling back to DEFAULT_STEP_SECONDS.
+    """
+    plan = []
+    for step_num in sorted(combined_steps):
+        items = combined_steps[step_num]
+        if not items:
+            continue
+        seconds = max(int(it.get("duration_sec") or DEFAULT_STEP_SECONDS) for it in items)
+        plan.append({
+            "step_number": step_num,
+            "seconds": seconds,
+            "items": [{
+                "factor": it["factor"],
+                "step_id": it["step_id"],
+                "instruction": it["instruction"],
+                "before_prompt": it.get("before_prompt") or "",
+                "after_prompt": it.get("after_prompt") or "",
+            } for it in items],
+        })
+    return plan
+
+def plan_key(plan: List[dict]) -> str:
+    """Widget key tied to the plan's step ids, so a new plan remounts the runner."""
+    ids = [str(it["step_id"]) for step in plan for it in step["items"]]
+    return "practice_session_" + hashlib.sha1(",".join(ids).encode()).hexdigest()[:12]
+
+def run_practice_session(combined_steps: Dict[int, List[dict]],
+                         key: Optional[str] = None,
+                         height: int = 560) -> Optional[dict]:
+    """
+    Mount the session runner. Timers, prompts and before/after inputs all live
+    in the iframe, so nothing reruns until the user submits; the return value
+    is then the full session result dict (None before that). The iframe only
+    reads the plan on its first render, so the key defaults to plan_key().
+    """
+    plan = build_plan(combined_steps)
+    return _practice_session(plan=plan, key=key or plan_key(plan),
+                             default=None, height=height)
@@ -0,0 +1,20 @@
+-- practice_sessions: one row per finished guided session
+-- (profile.save_practice_session). before/steps/after are the session
+-- runner's JSON; factors is the {factor: polarity} the session was built for.
+create table if not exists practice_sessions (
+    id           bigint generated by default as identity primary key,
+    user_email   text,
+    session_id   text,
+    started_at   timestamptz,
+    finished_at  timestamptz,
+    before       jsonb,
+    steps        jsonb,
+    after        jsonb,
+    improvement  real,
+    factors      jsonb
+);
+create index if not exists practice_sessions_user_started
+    on practice_sessions (user_email, started_at);
+
+-- tables created before the factors column existed
+alter table practice_sessions add column if not exists factors jsonb;
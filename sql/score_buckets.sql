@@ -0,0 +1,67 @@
+-- score_buckets: per-owner day / week / month rollups of assessment scores.
+-- owner is the user_email for logged-in users, else the anonymous session_id
+-- (see history.owner_key). Apply once in the Supabase SQL editor.
+
+create table if not exists score_buckets (
+    owner        text        not null,
+    granularity  text        not null check (granularity in ('day', 'week', 'month')),
+    bucket_start date        not null,
+    n            integer     not null default 0,
+    sums         jsonb       not null default '{}'::jsonb,
+    mins         jsonb       not null default '{}'::jsonb,
+    maxs         jsonb       not null default '{}'::jsonb,
+    primary key (owner, granularity, bucket_start)
+);
+
+-- Fold one assessment into all three buckets in a single statement.
+-- The increment happens inside ON CONFLICT, so concurrent submits for the
+-- same owner cannot lose updates. Weeks start on Monday (date_trunc('week')).
+create or replace function record_score_bucket(p_owner text, p_ts timestamptz, p_scores jsonb)
+returns void
+language sql
+as $$
+    insert into score_buckets as b (owner, granularity, bucket_start, n, sums, mins, maxs)
+    select p_owner, g, date_trunc(g, p_ts at time zone 'utc')::date, 1, p_scores, p_scores, p_scores
+    from unnest(array['day', 'week', 'month']) as g
+    on conflict (owner, granularity, bucket_start) do update set
+        n    = b.n + 1,
+        sums = b.sums || (select jsonb_object_agg(k, coalesce((b.sums ->> k)::float8, 0) + v::float8)
+                          from jsonb_each_text(excluded.sums) as e(k, v)),
+        mins = b.mins || (select jsonb_object_agg(k, least((b.mins ->> k)::float8, v::float8))
+                          from jsonb_each_text(excluded.mins) as e(k, v)),
+        maxs = b.maxs || (select jsonb_object_agg(k, greatest((b.maxs ->> k)::float8, v::float8))
+                          from jsonb_each_text(excluded.maxs) as e(k, v));
+$$;
+
+-- One-off backfill from assessments stored before the buckets existed.
+-- Run once, before the app starts calling record_score_bucket; buckets that
+-- already have a row are left untouched.
+with src as (
+    select coalesce(user_email, session_id) as owner,
+           "timestamp"::timestamptz at time zone 'utc' as ts,
+           scores
+    from assessments
+    where coalesce(user_email, session_id) is not null
+      and jsonb_typeof(scores) = 'object'
+),
+per_domain as (
+    select s.owner, g, date_trunc(g, s.ts)::date as bucket_start, e.k,
+           sum(e.v::float8) as s, min(e.v::float8) as lo, max(e.v::float8) as hi
+    from src s
+    cross join unnest(array['day', 'week', 'month']) as g
+    cross join jsonb_each_text(s.scores) as e(k, v)
+    group by 1, 2, 3, 4
+),
+counts as (
+    select s.owner, g, date_trunc(g, s.ts)::date as bucket_start, count(*)::int as n
+    from src s
+    cross join unnest(array['day', 'week', 'month']) as g
+    group by 1, 2, 3
+)
+insert into score_buckets (owner, granularity, bucket_start, n, sums, mins, maxs)
+select c.owner, c.g, c.bucket_start, c.n,
+       jsonb_object_agg(p.k, p.s), jsonb_object_agg(p.k, p.lo), jsonb_object_agg(p.k, p.hi)
+from counts c
+join per_domain p using (owner, g, bucket_start)
+group by c.owner, c.g, c.bucket_start, c.n
+on conflict (owner, granularity, bucket_start) do nothing;
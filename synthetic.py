@@ -0,0 +1,447 @@
+##########################
+# synthetic.py  •  synthetic population + scale fixture
+##########################
+"""
+Vectorised generator for realistic assessment histories, written in bulk to
+a local SQLite stand-in for the Supabase tables (`assessments`,
+`score_buckets`, `practice_sessions`). Every chunk is built with NumPy
+column operations – no per-row Python – so a 10M-row fixture builds in
+minutes.
+
+    python synthetic.py fixture.db --users 2000000 --per-user 5 --seed 7
+
+Output is reproducible for the same (seed, users, per_user, chunk_users).
+"""
+import os, json, sqlite3, argparse, time
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+from assessment import (DOMAINS, DOMAIN_IS_INVERSE, BASE_WEIGHTS, GONOGO_WEIGHTS,
+                        TWOBACK_WEIGHTS, ANSWER_OPTIONS, ANSWER_MULT, BASELINE_MODS,
+                        WEIGHTS_VERSION)
+from local_store import SCHEMA, INDEXES, ASSESSMENT_COLS, PRACTICE_COLS
+
+# ------------------------------------------------------------------ #
+#                       ──   CONST ANCHOR   ──                       #
+# ------------------------------------------------------------------ #
+D = {d: i for i, d in enumerate(DOMAINS)}
+
+# NumPy views of the answer tables in assessment.py
+BASELINE_MOD = np.array(BASELINE_MODS)
+MULT = {q: (dom, np.array(m)) for q, (dom, m) in ANSWER_MULT.items()}
+CLARIFIER_STRESS = ["Never", "Sometimes", "Frequently"]    # 'Frequently' -> +1 Stress/Anxiety
+
+SIGN = np.array([-1.0 if DOMAIN_IS_INVERSE.get(d) else 1.0 for d in DOMAINS])
+PRACTICE_RATE = 0.5     # share of assessments followed by a practice session
+
+GONOGO_TRIALS = 20      # microtask_go_nogo.html
+TWOBACK_TRIALS = 25     # microtask_2back.html
+
+
+# ------------------------------------------------------------------ #
+#                     ──   VECTOR HELPERS   ──                       #
+# ------------------------------------------------------------------ #
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+def _ordinal(rng, x, cuts, noise=0.5):
+    """Latent value + noise -> option index via thresholds."""
+    return np.searchsorted(cuts, x + noise * rng.standard_normal(len(x)))
+
+def _lognormal(rng, mean, cv, shape):
+    sigma = np.sqrt(np.log1p(cv ** 2))
+    mu = np.log(mean) - sigma ** 2 / 2
+    return np.exp(mu[:, None] + sigma[:, None] * rng.standard_normal(shape))
+
+def _rt_norm(rt, mask):
+    """min((stdev / mean) / 0.4, 1) over masked RTs, 0 when fewer than 2."""
+    k = mask.sum(1)
+    s = np.where(mask, rt, 0.0).sum(1)
+    ss = np.where(mask, rt ** 2, 0.0).sum(1)
+    mean = s / np.maximum(k, 1)
+    var = (ss - k * mean ** 2) / np.maximum(k - 1, 1)
+    cv = np.sqrt(np.maximum(var, 0.0)) / np.where(mean > 0, mean, 1.0)
+    return np.where(k > 1, np.minimum(cv / 0.4, 1.0), 0.0)
+
+# Strings are kept as object arrays: np.add on them runs a C loop of
+# str concatenations, far cheaper than fixed-width np.char arrays.
+# Pairwise (tree) joins keep the copying O(len · log parts).
+def _cat(*parts) -> np.ndarray:
+    parts = [np.asarray(p, dtype=object) for p in parts]
+    while len(parts) > 1:
+        parts = [np.add(parts[i], parts[i + 1]) if i + 1 < len(parts) else parts[i]
+                 for i in range(0, len(parts), 2)]
+    return parts[0]
+
+def _str(x) -> np.ndarray:
+    return np.asarray(x).astype(str).astype(object)
+
+# lookup tables for the hot per-trial columns (ints / tenths of ms)
+_INTS = np.array([str(i) for i in range(2000)], dtype=object)
+_TENTHS = np.array([f"{i / 10:.1f}" for i in range(15001)], dtype=object)
+_TENTHS_SEP = "," + _TENTHS
+_FRAC4 = np.array([f"{i:04d}" for i in range(10000)], dtype=object)
+
+def _num(x) -> np.ndarray:
+    """4-decimal JSON numbers built from integer lookups (float repr is slow)."""
+    x = np.asarray(x, dtype=float)
+    q = np.rint(np.abs(x) * 10000).astype(np.int64)
+    whole, frac = np.divmod(q, 10000)
+    whole_s = _INTS[whole] if whole.max(initial=0) < len(_INTS) else _str(whole)
+    return _cat(np.where((x < 0) & (q > 0), "-", ""), whole_s, ".", _FRAC4[frac])
+
+def _json_str(a) -> np.ndarray:
+    return _cat('"', a, '"')
+
+def _json_obj(fields: Dict[str, np.ndarray]) -> np.ndarray:
+    parts = []
+    for i, (k, v) in enumerate(fields.items()):
+        parts += [("{" if i == 0 else ",") + f'"{k}":', v]
+    return _cat(*parts, "}")
+
+def _tenths_list(x: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """(n, T) values -> JSON lists of the present cells, one decimal each."""
+    idx = np.rint(x * 10).astype(int)
+    seen = np.cumsum(present, axis=1) - present          # items before column j
+    cells = np.where(seen > 0, _TENTHS_SEP[idx], _TENTHS[idx])
+    return _cat("[", *np.where(present, cells, "").T, "]")
+
+# ------------------------------------------------------------------ #
+#                        ──   MICRO-TASKS   ──                       #
+# ------------------------------------------------------------------ #
+def simulate_gonogo(rng, state):
+    n = len(state)
+    focus, gaba = state[:, D["Focus"]], state[:, D["GABA"]]
+    stress, anx = state[:, D["Stress"]], state[:, D["Anxiety"]]
+
+    is_go = rng.random((n, GONOGO_TRIALS)) > 0.4
+    p_miss = _sigmoid(-2.8 - 0.6 * focus)[:, None]
+    p_fa = _sigmoid(-1.6 - 0.8 * gaba)[:, None]
+    u = rng.random((n, GONOGO_TRIALS))
+    hit = is_go & (u >= p_miss)
+    miss = is_go & ~hit
+    fa = ~is_go & (u < p_fa)
+    rt = np.clip(_lognormal(rng, 420 - 30 * focus + 20 * stress,
+                            np.clip(0.18 + 0.05 * stress + 0.05 * anx, 0.05, 0.6),
+                            (n, GONOGO_TRIALS)), 150, 1500).round(1)
+
+    hits, misses, fas = hit.sum(1), miss.sum(1), fa.sum(1)
+    total = np.maximum(1, hits + misses + fas)
+    metrics = {"commission": fas / total, "omission": misses / total,
+               "rt_var": _rt_norm(rt, hit)}
+
+    payload = _json_obj({
+        "reactionTimes": _tenths_list(rt, hit),
+        "falseAlarms": _INTS[fas], "misses": _INTS[misses], "correctHits": _INTS[hits],
+        "totalGo": _INTS[is_go.sum(1)], "totalNoGo": _INTS[(~is_go).sum(1)],
+        **{k: _num(v) for k, v in metrics.items()},
+    })
+    return metrics, payload
+
+# _RESPONSES[index, rt + 1 (0 = null), correct] -> one `responses` item
+_RESPONSES = np.array([[[f'{{"index":{j},"rt":{rt},"correct":{c}}}' for c in ("false", "true")]
+                        for rt in ["null"] + list(range(1500))]
+                       for j in range(TWOBACK_TRIALS)], dtype=object)
+
+def simulate_twoback(rng, state):
+    n, T = len(state), TWOBACK_TRIALS
+    focus, anx = state[:, D["Focus"]], state[:, D["Anxiety"]]
+
+    letters = rng.integers(0, 26, (n, T))
+    repeat = rng.random((n, T)) > 0.7
+    for i in range(2, T):                       # 25 column ops, not n row ops
+        letters[:, i] = np.where(repeat[:, i], letters[:, i - 2], letters[:, i])
+    expected = np.zeros((n, T), bool)
+    expected[:, 2:] = letters[:, 2:] == letters[:, :-2]
+
+    u = rng.random((n, T))
+    responded = np.where(expected, u < _sigmoid(0.8 + 0.8 * focus)[:, None],
+                         u < _sigmoid(-2.8 - 0.4 * focus + 0.3 * anx)[:, None])
+    rt = np.floor(np.clip(_lognormal(rng, 650 - 40 * focus, np.full(n, 0.25), (n, T)), 200, 1499))
+
+    hits = (responded & expected).sum(1)
+    fas = (responded & ~expected).sum(1)
+    misses = (~responded & expected).sum(1)
+    # score_twoback reads `reactionTimes`, which the 2-Back page never sends
+    metrics = {"accuracy": hits / np.maximum(1, hits + fas + misses),
+               "rt_var": np.zeros(n)}
+
+    # responded -> correct = expected; silent -> correct = not expected
+    rt_idx = np.where(responded, rt.astype(int) + 1, 0)
+    correct = (responded == expected).astype(int)
+    cells = _RESPONSES[np.arange(T), rt_idx, correct]
+    resp = _cat(*[p for j in range(T) for p in ((",", cells[:, j]) if j else (cells[:, j],))])
+    payload = _json_obj({
+        "hits": _INTS[hits], "falseAlarms": _INTS[fas], "misses": _INTS[misses],
+        "responses": _cat("[", resp, "]"),
+        **{k: _num(v) for k, v in metrics.items()},
+    })
+    return metrics, payload
+
+# ------------------------------------------------------------------ #
+#                          ──   SCORING   ──                         #
+# ------------------------------------------------------------------ #
+def _add(scores, weight_map, mult):
+    """Vector form of assessment.update_scores."""
+    for d, w in weight_map.items():
+        scores[:, D[d]] += 10 * w * mult
+
+def score_batch(ans: Dict[str, np.ndarray], gng: Dict[str, np.ndarray],
+                twb: Dict[str, np.ndarray], clar_stress: np.ndarray) -> np.ndarray:
+    """
+    Replays the assessment page order (Q2, Go/No-Go, Q3-Q10, Stress
+    clarifier, 2-Back, baseline modifier, clip) with the real weights.
+    """
+    n = len(ans["Q1"])
+    scores = np.full((n, len(DOMAINS)), 5.0)
+    for i, choice in enumerate(ANSWER_OPTIONS["Q2"]):
+        _add(scores, BASE_WEIGHTS["Q2"][choice], (ans["Q2"] == i).astype(float))
+    for k, w in GONOGO_WEIGHTS.items():
+        _add(scores, w, gng[k])
+    for q, (dom, mult) in MULT.items():
+        _add(scores, {dom: BASE_WEIGHTS[dom][q]}, mult[ans[q]])
+    _add(scores, {"Motivation": BASE_WEIGHTS["Motivation"]["Q7"]}, ans["Q7"])
+    _add(scores, {"Stress": 1.0, "Anxiety": 1.0}, (clar_stress == 2).astype(float))
+    for k, w in TWOBACK_WEIGHTS.items():
+        _add(scores, w, twb[k])
+    return np.clip(scores * BASELINE_MOD[ans["Q1"]][:, None], 0.0, 10.0)
+
+def _confidence() -> Dict[str, float]:
+    """conf after the fixed flow: Go/No-Go, Stress+Mood clarifiers, 2-Back."""
+    conf = {d: 0.0 for d in DOMAINS}
+    for d in ["GABA", "Focus", "Stress", "Anxiety",     # Go/No-Go
+              "Stress", "Mood",                         # clarifiers
+              "Focus", "Stress", "Anxiety"]:            # 2-Back
+        conf[d] = min(1.0, conf[d] + 0.2)
+    return conf
+
+CONFIDENCE_JSON = json.dumps(_confidence())
+
+def simulate_practice(rng, scores, state, ts) -> Dict[str, np.ndarray]:
+    """
+    practice_sessions columns for the assessments followed by a session
+    (None elsewhere). Factors follow profile.py's ≥50% coverage rule on the
+    stored scores; the before-intensity tracks the latent state in the
+    practised direction, so it carries signal the scores can miss.
+    """
+    n, k = scores.shape
+    norm = SIGN * (scores / 5.0 - 1.0)                      # profile.normalize_score
+    mag = np.abs(norm)
+    order = np.argsort(-mag, 1, kind="stable")
+    ranked = np.take_along_axis(mag, order, 1)
+    picked = (np.cumsum(ranked, 1) - ranked < 0.5 * ranked.sum(1, keepdims=True))
+    picked[:, 0] = True
+    chosen = np.zeros((n, k), bool)
+    np.put_along_axis(chosen, order, picked, 1)
+
+    pol = np.where(norm >= 0, 1.0, -1.0)
+    felt = np.clip(pol * SIGN * np.tanh(state / 1.5), 0.0, 1.0)
+    felt = (felt * chosen).sum(1) / chosen.sum(1)
+    intensity = np.clip(np.rint(10 * felt + rng.standard_normal(n)), 0, 10).astype(int)
+    improvement = np.clip(np.rint(30 + 40 * felt + 15 * rng.standard_normal(n)), 0, 100)
+
+    started = ts + rng.integers(60, 6 * 3600, n).astype("timedelta64[s]")
+    finished = started + rng.integers(180, 1200, n).astype("timedelta64[s]")
+    pol_s = np.where(pol > 0, "positive", "negative").astype(object)
+    pairs = _cat(*[np.where(chosen[:, i], _cat(f',"{d}":"', pol_s[:, i], '"'), "")
+                   for i, d in enumerate(DOMAINS)])
+    has = rng.random(n) < PRACTICE_RATE
+    keep = lambda a: np.where(has, a, None)
+    return {
+        "started_at": keep(started.astype(str)),
+        "finished_at": keep(finished.astype(str)),
+        "before": keep(_cat('{"text":"","intensity":', _INTS[intensity], "}")),
+        "improvement": keep(improvement),
+        "factors": keep(_cat("{", pd.Series(pairs).str.slice(1).to_numpy(object), "}")),
+    }
+
+# ------------------------------------------------------------------ #
+#                         ──   GENERATOR   ──                        #
+# ------------------------------------------------------------------ #
+def generate_chunk(seed: int, chunk_idx: int, first_user: int, n_users: int,
+                   per_user: float, start: np.datetime64) -> pd.DataFrame:
+    """
+    One chunk of users with their full histories, as `assessments` rows.
+    Each user carries persistent traits plus a slow practice trend, so
+    consecutive assessments are correlated like real ones.
+    """
+    rng = np.random.default_rng([seed, chunk_idx])
+    k = len(DOMAINS)
+
+    # history length: heavy tailed, mean ≈ per_user
+    sigma = 1.0
+    counts = 1 + np.floor(rng.lognormal(np.log(max(per_user - 0.5, 0.1)) - sigma ** 2 / 2,
+                                        sigma, n_users)).astype(np.int64)
+    user = np.repeat(np.arange(n_users), counts)
+    n = len(user)
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    nth = np.arange(n) - first                                  # 0-based index in history
+
+    # timestamps: random start, exponential gaps (mean 3 days)
+    gaps = rng.exponential(3 * 86400, n).astype(np.int64)
+    gaps[first == np.arange(n)] = 0
+    csum = np.cumsum(gaps)
+    offset = csum - csum[first]
+    t0 = rng.integers(0, 730 * 86400, n_users)
+    ts = start + (t0[user] + offset).astype("timedelta64[s]")
+
+    # latent state per row (signed like the raw domain score)
+    traits = rng.standard_normal((n_users, k))
+    trend = 0.4 * np.tanh(nth / 20.0)[:, None] * np.array(
+        [-1.0 if d in ("Stress", "Anxiety") else 1.0 for d in DOMAINS])
+    state = traits[user] + trend + 0.5 * rng.standard_normal((n, k))
+    g = lambda d: state[:, D[d]]
+
+    ans = {
+        "Q1": _ordinal(rng, -g("Mood"), [-0.9, 0.9]),
+        "Q2": np.argmax(np.stack([-g("Stress"), g("Focus"),
+                                  g("Stress") + 0.5 * g("Anxiety"), -g("Motivation")], 1)
+                        + rng.gumbel(size=(n, 4)), 1),
+        "Q3": _ordinal(rng, -g("Mood"), [-1.0, 0.3, 1.3]),
+        "Q4": _ordinal(rng, -(g("Mood") + g("Motivation")) / 2, [-0.8, 0.4, 1.4]),
+        "Q5": _ordinal(rng, -g("Social"), [-0.8, 0.5, 1.5]),
+        "Q6": (g("Social") + 0.6 * rng.standard_normal(n) < -0.3).astype(np.int64),
+        "Q7": np.clip(np.round((0.4 * g("Motivation") + 0.2 * rng.standard_normal(n)) / 0.05) * 0.05,
+                      -1.0, 1.0),
+        "Q8": _ordinal(rng, -g("Motivation"), [-0.8, 0.5, 1.5]),
+        "Q9": _ordinal(rng, g("Anxiety"), [-0.5, 0.5, 1.5]),
+        "Q10": _ordinal(rng, g("Anxiety"), [0.0, 1.0, 2.0]),
+    }
+    clar_stress = _ordinal(rng, g("Stress"), [0.0, 1.5])
+    gng, gng_json = simulate_gonogo(rng, state)
+    twb, twb_json = simulate_twoback(rng, state)
+    scores = score_batch(ans, gng, twb, clar_stress)
+    practice = simulate_practice(rng, scores, state, ts)
+
+    q12 = np.clip(np.round((0.7 + 0.15 * rng.standard_normal(n)) / 0.05) * 0.05, 0.0, 1.0)
+    raw = _json_obj({
+        **{q: _json_str(np.array(ANSWER_OPTIONS[q], dtype=object)[ans[q]]) for q in ("Q1", "Q2")},
+        "gonogo": gng_json,
+        **{q: _json_str(np.array(ANSWER_OPTIONS[q], dtype=object)[ans[q]]) for q in ("Q3", "Q4", "Q5", "Q6")},
+        "Q7": _num(ans["Q7"]),
+        **{q: _json_str(np.array(ANSWER_OPTIONS[q], dtype=object)[ans[q]]) for q in ("Q8", "Q9", "Q10")},
+        "twoback": twb_json,
+        "Q12": _num(q12),
+    })
+
+    uid = _str(first_user + user)
+    return pd.DataFrame({
+        "user_email": _cat("user", uid, "@synthetic.local"),
+        "session_id": _cat("syn-", uid, "-", _str(nth)),
+        "timestamp": ts.astype(str),
+        "scores": _json_obj({d: _num(scores[:, i]) for i, d in enumerate(DOMAINS)}),
+        "confidence": CONFIDENCE_JSON,
+        "raw": raw,
+        "source": "synthetic",
+        # helper columns for bucket_rows / practice_rows; not written to `assessments`
+        "_user": first_user + user,
+        "_day": ts.astype("datetime64[D]"),
+        **{f"_{d}": scores[:, i] for i, d in enumerate(DOMAINS)},
+        **{f"_ps_{c}": v for c, v in practice.items()},
+    })
+
+def iter_chunks(users: int, per_user: float = 5.0, seed: int = 0,
+                chunk_users: int = 10_000,
+                start: str = "2023-01-01") -> Iterator[pd.DataFrame]:
+    start64 = np.datetime64(start, "s")
+    for ci, first in enumerate(range(0, users, chunk_users)):
+        yield generate_chunk(seed, ci, first, min(chunk_users, users - first), per_user, start64)
+
+# ------------------------------------------------------------------ #
+#                       ──   LOCAL BACKEND   ──                      #
+# ------------------------------------------------------------------ #
+def _bucket_keys(day: np.ndarray) -> Dict[str, np.ndarray]:
+    """Bucket start per row, matching record_score_bucket (weeks start Monday)."""
+    d = day.astype(np.int64)                           # days since 1970-01-01 (a Thursday)
+    return {
+        "day": day,
+        "week": (d - (d + 3) % 7).astype("datetime64[D]"),
+        "month": day.astype("datetime64[M]").astype("datetime64[D]"),
+    }
+
+def bucket_rows(df: pd.DataFrame) -> Iterator[Tuple]:
+    """
+    Day / week / month bucket rows for one chunk, in history.py's format.
+    Chunks hold whole users with histories in time order, so every bucket is
+    one contiguous run of rows and reduceat aggregates it in place.
+    """
+    scores = df[[f"_{d}" for d in DOMAINS]].to_numpy()
+    user = df["_user"].to_numpy()
+    owner = df["user_email"].to_numpy()
+    for g, key in _bucket_keys(df["_day"].to_numpy().astype("datetime64[D]")).items():
+        start = np.flatnonzero(np.r_[True, (user[1:] != user[:-1]) | (key[1:] != key[:-1])])
+        n = np.diff(np.r_[start, len(user)])
+        packed = [_json_obj({d: _num(agg[:, i]) for i, d in enumerate(DOMAINS)})
+                  for agg in (np.add.reduceat(scores, start),
+                              np.minimum.reduceat(scores, start),
+                              np.maximum.reduceat(scores, start))]
+        yield from zip(owner[start].tolist(), [g] * len(start),
+                       key[start].astype(str).tolist(), n.tolist(),
+                       *(p.tolist() for p in packed))
+
+def practice_rows(df: pd.DataFrame) -> Iterator[Tuple]:
+    """`practice_sessions` rows for the chunk, in PRACTICE_COLS order."""
+    ps = df[df["_ps_started_at"].notna()]
+    n = len(ps)
+    return zip(ps["user_email"], ps["session_id"], ps["_ps_started_at"],
+               ps["_ps_finished_at"], ps["_ps_before"], ["[]"] * n,
+               ['{"text":""}'] * n, ps["_ps_improvement"], ps["_ps_factors"])
+
+def write_sqlite(path: str, chunks: Iterator[pd.DataFrame], buckets: bool = True,
+                 log=print) -> int:
+    """Stream chunks into SQLite, one transaction per chunk. Returns row count."""
+    con = sqlite3.connect(path)
+    con.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;" + SCHEMA)
+    total, t0 = 0, time.time()
+    for df in chunks:
+        with con:
+            con.executemany(
+                f"INSERT INTO assessments ({', '.join(ASSESSMENT_COLS)}) VALUES (?,?,?,?,?,?,?)",
+                df[ASSESSMENT_COLS].itertuples(index=False, name=None))
+            con.executemany(
+                f"INSERT INTO practice_sessions ({', '.join(PRACTICE_COLS)}) "
+                f"VALUES ({', '.join('?' * len(PRACTICE_COLS))})", practice_rows(df))
+            if buckets:
+                con.executemany("INSERT INTO score_buckets VALUES (?,?,?,?,?,?,?)",
+                                bucket_rows(df))
+        total += len(df)
+        log(f"{total:,} rows  ({time.time() - t0:.0f}s)")
+    con.executescript(INDEXES)
+    con.close()
+    return total
+
+def scale_fixture(path: str = None, users: int = 2_000_000, per_user: float = 5.0,
+                  seed: int = 0, buckets: bool = True, chunk_users: int = 10_000) -> str:
+    """
+    Build (once) and return the path of a seeded SQLite fixture. The file
+    name encodes everything the contents depend on – including the loaded
+    weights version the scores were computed with – so it is reused across
+    runs but never after a recalibration.
+    """
+    path = path or os.path.join(
+        os.getenv("RUDRAKSHYNC_FIXTURES", ".fixtures"),
+        f"synthetic_u{users}_p{per_user:g}_s{seed}_c{chunk_users}_w{WEIGHTS_VERSION}.db")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".part"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        write_sqlite(tmp, iter_chunks(users, per_user, seed, chunk_users), buckets=buckets,
+                     log=lambda *_: None)
+        os.replace(tmp, path)
+    return path
+
+# ------------------------------------------------------------------ #
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Write a synthetic assessment population to SQLite.")
+    ap.add_argument("db")
+    ap.add_argument("--users", type=int, default=2_000_000)
+    ap.add_argument("--per-user", type=float, default=5.0, help="mean assessments per user")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--chunk-users", type=int, default=10_000)
+    ap.add_argument("--no-buckets", action="store_true")
+    a = ap.parse_args()
+    write_sqlite(a.db, iter_chunks(a.users, a.per_user, a.seed, a.chunk_users),
+                 buckets=not a.no_buckets)
@@ -0,0 +1,193 @@
+import io, json, threading, time, urllib.error
+
+import jwt
+import pytest
+import streamlit as st
+
+import auth
+from local_issuer import LocalIssuer
+from supabase_client import supabase
+
+EMAIL, PASSWORD = "a@b.c", "pw"
+SECRET = "test-secret-at-least-32-bytes-long!"
+
+
+@pytest.fixture
+def issuer():
+    iss = LocalIssuer(ttl=3600)
+    iss.add_user(EMAIL, PASSWORD)
+    auth.configure(**iss.backend())
+    yield iss
+    auth.sign_out()
+    auth._signing_keys.clear()
+
+
+def _wait_for(cond, timeout=5.0):
+    deadline = time.time() + timeout
+    while not cond():
+        if time.time() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+def test_sign_in_sets_session(issuer):
+    user = auth.sign_in(EMAIL, PASSWORD)
+    assert user["email"] == EMAIL
+    assert user["role"] == "authenticated"
+    assert st.session_state["user_email"] == EMAIL
+    assert auth.current_user() == user
+
+
+def test_sign_in_rejects_bad_password(issuer):
+    with pytest.raises(ValueError):
+        auth.sign_in(EMAIL, "wrong")
+    assert auth.current_user() is None
+
+
+def test_cached_current_user_needs_no_jwks_fetch(issuer):
+    auth.sign_in(EMAIL, PASSWORD)
+    assert issuer.jwks_calls == 1
+    for _ in range(100):
+        assert auth.current_user()["email"] == EMAIL
+    assert issuer.jwks_calls == 1
+
+
+def test_background_refresh_before_expiry(issuer, monkeypatch):
+    monkeypatch.setattr(auth, "REFRESH_MARGIN", 60)
+    issuer.ttl = 30                                  # already inside the margin
+    auth.sign_in(EMAIL, PASSWORD)
+    sess = st.session_state["auth"]
+    old_token = sess.refresh_token
+
+    issuer.ttl = 3600
+    assert auth.current_user() is not None           # served from cache
+    _wait_for(lambda: sess.refresh_token != old_token)
+    assert sess.expires_at > time.time() + 3000
+    assert auth.current_user()["email"] == EMAIL
+
+
+def test_lapsed_token_joins_inflight_refresh(issuer, monkeypatch):
+    monkeypatch.setattr(auth, "REFRESH_MARGIN", 60)
+    entered, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_refresh(token):
+        calls.append(token)
+        entered.set()
+        release.wait(5)
+        return issuer.refresh(token)
+
+    auth.sign_in(EMAIL, PASSWORD)
+    auth.configure(refresh=slow_refresh)
+    sess = st.session_state["auth"]
+    sess.expires_at = time.time() + 30               # background refresh starts
+    assert auth.current_user() is not None
+    assert entered.wait(5)
+
+    sess.expires_at = time.time() - auth.LEEWAY - 1  # now lapsed as well
+    threading.Timer(0.1, release.set).start()
+    assert auth.current_user()["email"] == EMAIL
+    assert len(calls) == 1                           # single-use token spent once
+
+
+def test_key_rotation(issuer, monkeypatch):
+    monkeypatch.setattr(auth, "KEYS_MIN_REFETCH", 0)
+    auth.sign_in(EMAIL, PASSWORD)
+    old_kid = issuer.kid
+
+    issuer.rotate_key()
+    tokens = issuer.issue(EMAIL)
+    claims = auth.verify_token(tokens["access_token"])
+    assert claims["email"] == EMAIL
+    assert issuer.kid != old_kid
+    assert issuer.jwks_calls == 2                    # one refetch for the new kid
+
+
+def test_unknown_kid_refetch_is_rate_limited(issuer):
+    auth.sign_in(EMAIL, PASSWORD)
+    issuer.rotate_key()
+    tokens = issuer.issue(EMAIL)
+    with pytest.raises(auth.jwt.InvalidTokenError):
+        auth.verify_token(tokens["access_token"])
+    assert issuer.jwks_calls == 1
+
+
+def test_expiry_signs_out(issuer):
+    auth.sign_in(EMAIL, PASSWORD)
+    sess = st.session_state["auth"]
+    issuer._refresh.clear()                          # refresh token revoked
+    sess.expires_at = time.time() - auth.LEEWAY - 1
+
+    assert auth.current_user() is None
+    for k in ("auth", "user", "user_email"):
+        assert k not in st.session_state
+
+
+def test_expiry_recovers_with_valid_refresh_token(issuer):
+    auth.sign_in(EMAIL, PASSWORD)
+    sess = st.session_state["auth"]
+    sess.expires_at = time.time() - auth.LEEWAY - 1
+
+    assert auth.current_user()["email"] == EMAIL
+    assert sess.expires_at > time.time()
+
+
+def _fake_gotrue(issuer, seen):
+    """urlopen stand-in answering /auth/v1/token from the LocalIssuer."""
+    def urlopen(req, timeout=None):
+        seen.append(req.full_url)
+        body = json.loads(req.data)
+        try:
+            if req.full_url.endswith("grant_type=password"):
+                tokens = issuer.sign_in(body["email"], body["password"])
+            else:
+                tokens = issuer.refresh(body["refresh_token"])
+        except ValueError as e:
+            err = io.BytesIO(json.dumps({"error_description": str(e)}).encode())
+            raise urllib.error.HTTPError(req.full_url, 400, "Bad Request", {}, err)
+        return io.BytesIO(json.dumps({**tokens, "token_type": "bearer"}).encode())
+    return urlopen
+
+
+def test_token_grants_leave_shared_client_untouched(issuer, monkeypatch):
+    seen = []
+    monkeypatch.setattr(auth.urllib.request, "urlopen", _fake_gotrue(issuer, seen))
+    auth.configure(sign_in=auth._sign_in, refresh=auth._refresh)
+    headers = dict(supabase.options.headers)
+    auth_headers = dict(supabase.auth._headers)
+
+    auth.sign_in(EMAIL, PASSWORD)
+    sess = st.session_state["auth"]
+    old = sess.refresh_token
+    sess._refresh(old)
+
+    assert sess.refresh_token != old
+    assert seen == [f"{auth.TOKEN_URL}?grant_type=password",
+                    f"{auth.TOKEN_URL}?grant_type=refresh_token"]
+    assert dict(supabase.options.headers) == headers
+    assert dict(supabase.auth._headers) == auth_headers
+    assert supabase.auth.get_session() is None
+
+
+def test_token_grant_error_message(issuer, monkeypatch):
+    monkeypatch.setattr(auth.urllib.request, "urlopen", _fake_gotrue(issuer, []))
+    auth.configure(sign_in=auth._sign_in)
+    with pytest.raises(ValueError, match="Invalid login credentials"):
+        auth.sign_in(EMAIL, "wrong")
+
+
+def test_hs256_needs_secret(monkeypatch):
+    token = jwt.encode({"sub": "u", "aud": "authenticated", "exp": int(time.time()) + 60},
+                       SECRET, algorithm="HS256")
+    monkeypatch.setattr(auth, "JWT_SECRET", None)
+    with pytest.raises(auth.AuthConfigError):
+        auth.verify_token(token)
+    monkeypatch.setattr(auth, "JWT_SECRET", SECRET)
+    assert auth.verify_token(token)["sub"] == "u"
+
+
+def test_config_error_without_published_keys(issuer, monkeypatch):
+    monkeypatch.setattr(auth, "JWT_SECRET", None)
+    assert auth.config_error() is None               # issuer publishes a key
+    auth.configure(fetch_jwks=lambda: {"keys": []})
+    assert auth.config_error() == auth.HS256_HELP
@@ -0,0 +1,72 @@
+import json, os
+
+import numpy as np
+import pytest
+
+import assessment
+import calibrate
+import synthetic
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("cal") / "tiny.db")
+    synthetic.write_sqlite(path, synthetic.iter_chunks(400, 3.0, seed=1, chunk_users=200),
+                           buckets=False, log=lambda *_: None)
+    return path
+
+
+def test_frozen_questions_have_no_slots():
+    paths = [path for path, _ in calibrate.weight_slots()]
+    assert ("BASE_WEIGHTS", "Mood", "Q3") not in paths
+    assert ("BASE_WEIGHTS", "Anxiety", "Q9") not in paths
+    assert ("BASE_WEIGHTS", "Anxiety", "Q10") in paths
+
+
+def test_accumulate_is_chunk_invariant(db):
+    slots = calibrate.weight_slots()
+    a = calibrate.accumulate(calibrate.iter_sqlite(db, chunk=97), slots)
+    b = calibrate.accumulate(calibrate.iter_sqlite(db, chunk=1_000_000), slots)
+    for k in range(len(assessment.DOMAINS)):
+        np.testing.assert_allclose(a[0][k], b[0][k])
+        np.testing.assert_allclose(a[1][k], b[1][k])
+    np.testing.assert_array_equal(a[3], b[3])
+
+
+def test_solve_matches_lstsq(db):
+    slots = calibrate.weight_slots()
+    alpha = 0.5
+    XtX, XtY, YtY, n = calibrate.accumulate(calibrate.iter_sqlite(db), slots)
+    w = calibrate.solve(XtX, XtY, n, slots, alpha)
+
+    X, Y = calibrate.features(next(calibrate.iter_sqlite(db, chunk=1_000_000)), slots)
+    w0 = np.array([calibrate._current(path) for path, _ in slots])
+    for k, ix in enumerate(calibrate.domain_slots(slots)):
+        rows = ~np.isnan(Y[:, k])
+        assert rows.sum() == n[k]
+        if not n[k]:
+            continue
+        # ridge towards w0 == least squares on the augmented system
+        A = np.vstack([X[np.ix_(rows, ix)] / np.sqrt(n[k]), np.sqrt(alpha) * np.eye(len(ix))])
+        b = np.r_[Y[rows, k] / np.sqrt(n[k]), np.sqrt(alpha) * w0[ix]]
+        np.testing.assert_allclose(w[ix], np.linalg.lstsq(A, b, rcond=None)[0], atol=1e-8)
+
+
+def test_synthetic_fit_is_staged_and_never_loaded(db, tmp_path, monkeypatch):
+    for name in ("BASE_WEIGHTS", "GONOGO_WEIGHTS", "TWOBACK_WEIGHTS", "WEIGHTS_VERSION"):
+        monkeypatch.setattr(assessment, name, getattr(assessment, name))
+    out = calibrate.calibrate(db, weights_dir=str(tmp_path))
+    with open(out) as f:
+        meta = json.load(f)
+    assert meta["synthetic"] is True
+    assert meta["limitations"]
+    assert calibrate.STAGING_DIR == os.path.join(assessment.WEIGHTS_DIR, "staging")
+
+    assessment.load_weight_file(str(tmp_path))
+    assert assessment.WEIGHTS_VERSION == 0
+
+    meta["synthetic"] = False                        # as if fitted on real data
+    with open(tmp_path / "weights_v0002.json", "w") as f:
+        json.dump(meta, f)
+    assessment.load_weight_file(str(tmp_path))
+    assert assessment.WEIGHTS_VERSION == 2
@@ -0,0 +1,37 @@
+import numpy as np
+
+import history
+
+
+def test_lttb_keeps_endpoints_and_size():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50.0)
+    keep = history.lttb(x, y, 100)
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_keeps_spike():
+    x = np.arange(500, dtype=float)
+    y = np.zeros(500)
+    y[321] = 10.0
+    assert 321 in history.lttb(x, y, 20)
+
+
+def test_lttb_short_series_untouched():
+    x = np.arange(5, dtype=float)
+    assert list(history.lttb(x, x, 10)) == [0, 1, 2, 3, 4]
+
+
+def test_merge_buckets():
+    a = {"bucket_start": "2024-01-01", "n": 2,
+         "sums": {"Mood": 10.0}, "mins": {"Mood": 4.0}, "maxs": {"Mood": 6.0}}
+    b = {"bucket_start": "2024-01-01", "n": 1,
+         "sums": {"Mood": 7.0}, "mins": {"Mood": 7.0}, "maxs": {"Mood": 7.0}}
+    m = history.merge_buckets(a, b)
+    assert m["n"] == 3
+    assert m["sums"] == {"Mood": 17.0}
+    assert m["mins"] == {"Mood": 4.0}
+    assert m["maxs"] == {"Mood": 7.0}
+    assert a["n"] == 2                               # inputs untouched
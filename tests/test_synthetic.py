@@ -0,0 +1,86 @@
+import hashlib, json
+
+import numpy as np
+import pytest
+import streamlit as st
+
+import assessment
+import synthetic
+from local_store import ASSESSMENT_COLS
+
+START = np.datetime64("2024-01-01", "s")
+
+
+@pytest.fixture
+def chunk(monkeypatch):
+    """~1k-row chunk plus the Stress clarifier answers, which raw doesn't keep."""
+    seen = {}
+    score_batch = synthetic.score_batch
+
+    def spy(ans, gng, twb, clar_stress):
+        seen["clar_stress"] = clar_stress
+        return score_batch(ans, gng, twb, clar_stress)
+
+    monkeypatch.setattr(synthetic, "score_batch", spy)
+    return synthetic.generate_chunk(3, 0, 0, 250, 4.0, START), seen["clar_stress"]
+
+
+def _replay(raw: dict, clarifier: str, monkeypatch) -> dict:
+    """Run one row's answers through the real pages and task scorers."""
+    for k in list(st.session_state.keys()):
+        del st.session_state[k]
+    assessment.init_session()
+    answers = []
+    monkeypatch.setattr(assessment.st, "radio", lambda *a, **k: answers.pop(0))
+    monkeypatch.setattr(assessment.st, "slider", lambda *a, **k: answers.pop(0))
+    monkeypatch.setattr(assessment.st, "button", lambda *a, **k: False)
+
+    pages = [(assessment.page_baseline, ["Q1"]), (assessment.page_state_word, ["Q2"]),
+             (lambda: assessment.score_gonogo(raw["gonogo"]), []),
+             (assessment.page_mood, ["Q3", "Q4"]), (assessment.page_social, ["Q5", "Q6"]),
+             (assessment.page_motivation, ["Q7", "Q8"]), (assessment.page_anxiety, ["Q9", "Q10"])]
+    for page, qs in pages:
+        answers += [raw[q] for q in qs]
+        page()
+    answers.append(clarifier)
+    assessment.page_clarifier("Stress")
+    assessment.score_twoback(raw["twoback"])
+    return {d: max(0.0, min(10.0, st.session_state.scores[d] * st.session_state.baseline_mod))
+            for d in assessment.DOMAINS}
+
+
+def test_fixture_scores_match_real_pages(chunk, monkeypatch):
+    df, clar = chunk
+    assert len(df) > 800
+    for i in range(len(df)):
+        raw = json.loads(df["raw"].iloc[i])
+        stored = json.loads(df["scores"].iloc[i])
+        metrics = {"gonogo": dict(raw["gonogo"]), "twoback": dict(raw["twoback"])}
+        scores = _replay(raw, synthetic.CLARIFIER_STRESS[clar[i]], monkeypatch)
+        for d in assessment.DOMAINS:
+            assert scores[d] == pytest.approx(stored[d], abs=1e-4)
+        for task in ("gonogo", "twoback"):
+            for k, v in st.session_state.user_data[task].items():
+                if isinstance(v, float):
+                    assert v == pytest.approx(metrics[task][k], abs=1e-4)
+
+
+def _digest(df) -> str:
+    return hashlib.sha256(df[ASSESSMENT_COLS].to_csv(index=False).encode()).hexdigest()
+
+
+def test_same_seed_same_rows():
+    chunks = lambda seed: [_digest(df) for df in synthetic.iter_chunks(300, 3.0, seed, 100)]
+    assert chunks(5) == chunks(5)
+    assert chunks(5) != chunks(6)
+
+
+
+def test_practice_rows_follow_assessments(chunk):
+    df, _ = chunk
+    rows = list(synthetic.practice_rows(df))
+    assert 0 < len(rows) < len(df)
+    for email, session_id, started, finished, before, steps, after, improvement, factors in rows:
+        assert started < finished
+        assert 0 <= json.loads(before)["intensity"] <= 10
+        assert set(json.loads(factors).values()) <= {"positive", "negative"}